@@ -0,0 +1,73 @@
+"""
+Сравнение памяти хранилища задач: список словарей (как в json.load) и компактные Task.
+Каждое представление измеряется в отдельном процессе:
+    python -m benchmarks.bench_memory --count 200000
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+from manager_app.task import Task
+from .generator import generate_tasks
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(filename: str, representation: str) -> dict[str, int]:
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    with open(filename, "r") as f:
+        if representation == "dict":
+            tasks = json.load(f)
+        else:
+            tasks = json.load(f, object_hook=Task)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"tasks": len(tasks), "traced": traced, "rss": rss_bytes() - rss_before}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--measure", choices=("dict", "task"))
+    parser.add_argument("--file")
+    args = parser.parse_args()
+    if args.measure:
+        print(json.dumps(measure(args.file, args.measure)))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "tasks.json")
+        with open(filename, "w") as f:
+            json.dump(list(generate_tasks(args.count)), f, ensure_ascii=False)
+        for representation in ("dict", "task"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_memory",
+                    "--measure",
+                    representation,
+                    "--file",
+                    filename,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{representation:>5}: задач {result['tasks']}, "
+                f"python heap {result['traced'] / 2**20:.1f} МБ, RSS {result['rss'] / 2**20:.1f} МБ"
+            )
+
+
+if __name__ == "__main__":
+    main()
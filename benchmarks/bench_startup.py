@@ -0,0 +1,91 @@
+"""
+Время старта консольного менеджера на большом хранилище: от запуска процесса
+до первого приглашения ввода команды и до завершения команды 'add task'.
+Каждый замер - отдельный процесс python -m manager_app.manager:
+    python -m benchmarks.bench_startup --count 200000 --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from manager_app.manager import TaskManager
+from .generator import generate_tasks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPT = "Введите команду: ".encode()
+ADDED = "добавлена в менеджера задач".encode()
+ADD_TASK_INPUT = ["add task", "bench", "startup benchmark", "Работа", "2099-01-01", "низкий"]
+
+
+def read_until(stream, marker: bytes, output: bytearray) -> None:
+    while marker not in output:
+        chunk = os.read(stream.fileno(), 65536)
+        if not chunk:
+            raise RuntimeError(f"Процесс завершился до вывода {marker.decode()!r}")
+        output += chunk
+
+
+def measure(workdir: str, engine: str) -> tuple[float, float]:
+    """Время до первого приглашения и до добавления задачи, в секундах."""
+
+    env = {**os.environ, "PYTHONPATH": ROOT, "TASK_STORAGE_ENGINE": engine}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "manager_app.manager"],
+        cwd=workdir,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    output = bytearray()
+    read_until(process.stdout, PROMPT, output)
+    first_prompt = time.perf_counter() - start
+    process.stdin.write("".join(f"{line}\n" for line in ADD_TASK_INPUT).encode())
+    process.stdin.flush()
+    read_until(process.stdout, ADDED, output)
+    added = time.perf_counter() - start
+    process.stdin.write(b"leave\n")
+    process.stdin.close()
+    process.wait()
+    return first_prompt, added
+
+
+def prepare(workdir: str, engine: str, count: int) -> None:
+    with open(os.path.join(workdir, "tasks.json"), "w") as f:
+        json.dump(list(generate_tasks(count)), f, ensure_ascii=False)
+    # одна мутация записывает метаданные хранилища, как при обычной работе.
+    current = os.getcwd()
+    os.chdir(workdir)
+    try:
+        storage = TaskManager.storage_class(engine)()
+        storage.done_task(1)
+    finally:
+        os.chdir(current)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engines", nargs="+", default=["json", "journal"])
+    args = parser.parse_args()
+    for engine in args.engines:
+        with tempfile.TemporaryDirectory() as workdir:
+            prepare(workdir, engine, args.count)
+            results = [measure(workdir, engine) for _ in range(args.repeat)]
+        first_prompt = statistics.median(result[0] for result in results)
+        added = statistics.median(result[1] for result in results)
+        print(
+            f"{engine:>8}: задач {args.count}, первое приглашение {first_prompt * 1000:.0f} мс, "
+            f"add task {added * 1000:.0f} мс"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Бенчмарк горячих путей хранилища и менеджера на синтетических задачах:
+загрузка, добавление, поиск (категория, статус, ключевые слова, составной запрос),
+редактирование, вывод первой страницы show_tasks и удаление по категории.
+Для каждой операции выводятся пропускная способность, перцентили задержки и пиковая
+память (tracemalloc, отдельным прогоном), результаты можно сохранить в JSON
+и сравнить с результатами другого коммита:
+    python -m benchmarks.bench_storage --sizes 1000 100000 --output results.json
+    python -m benchmarks.bench_storage --sizes 1000 100000 --compare results.json
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import builtins
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Any, Callable
+
+from manager_app import serializers
+from manager_app.manager import TaskManager
+from .generator import CATEGORIES, PRIORITIES, WORDS, generate_tasks, generate_title
+
+# операции выполняются в указанном порядке, удаление - последним, так как меняет данные.
+READ_OPERATIONS = (
+    "load",
+    "search_category",
+    "search_status",
+    "search_keywords",
+    "query",
+    "show_tasks",
+)
+WRITE_OPERATIONS = ("add_task", "edit_task", "delete_category")
+REGRESSION_RATIO = 1.2
+
+
+class BenchContext:
+    def __init__(self, storage_class: type, size: int, seed: int) -> None:
+        self.storage_class = storage_class
+        self.storage = storage_class()
+        self.size = size
+        self.rnd = random.Random(seed)
+        self.manager = TaskManager()
+        self.manager._storage = self.storage
+
+    def load(self, step: int) -> None:
+        if (close := getattr(self.storage, "close", None)) is not None:
+            close()
+        self.storage = self.manager._storage = self.storage_class()
+        self.storage.search_task(("id", 1))
+
+    def search_category(self, step: int) -> None:
+        self.storage.search_task(("category", CATEGORIES[step % len(CATEGORIES)]))
+
+    def search_status(self, step: int) -> None:
+        self.storage.search_task(("status", "Выполнена"))
+
+    def search_keywords(self, step: int) -> None:
+        self.storage.search_task(("keywords", self.rnd.sample(WORDS, 2)))
+
+    def query(self, step: int) -> None:
+        self.storage.query(
+            {
+                "category": CATEGORIES[step % len(CATEGORIES)],
+                "status": "Не выполнена",
+                "due_date": {"from": "2025-03-01", "to": "2025-06-30"},
+            },
+            "due_date",
+            0,
+            20,
+        )
+
+    def show_tasks(self, step: int) -> None:
+        original_input = builtins.input
+        builtins.input = lambda prompt="": ""
+        try:
+            with redirect_stdout(io.StringIO()):
+                self.manager.show_tasks()
+        finally:
+            builtins.input = original_input
+
+    def add_task(self, step: int) -> None:
+        self.storage.add_task(
+            {
+                "id": None,
+                "title": generate_title(self.rnd),
+                "description": " ".join(self.rnd.choices(WORDS, k=8)),
+                "category": self.rnd.choice(CATEGORIES),
+                "due_date": "2099-01-01",
+                "priority": self.rnd.choice(PRIORITIES),
+                "status": "Не выполнена",
+            }
+        )
+
+    def edit_task(self, step: int) -> None:
+        self.storage.edit_task((self.rnd.randint(1, self.size), "priority", "Высокий"))
+
+    def delete_category(self, step: int) -> None:
+        self.storage.delete_task(("category", CATEGORIES[step % len(CATEGORIES)]))
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Перцентиль методом ближайшего ранга."""
+
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_operation(operation: Callable[[int], None], ops: int) -> dict[str, float]:
+    latencies = []
+    for step in range(ops):
+        start = time.perf_counter()
+        operation(step)
+        latencies.append(time.perf_counter() - start)
+    # пиковая память измеряется отдельным прогоном: tracemalloc замедляет выполнение.
+    tracemalloc.start()
+    operation(ops)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = sum(latencies)
+    return {
+        "ops": ops,
+        "total_s": total,
+        "throughput": ops / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "peak_mb": peak / 2**20,
+    }
+
+
+def prepare_store(workdir: str, engine: str, size: int, seed: int) -> type:
+    """Класс хранилища движка с файлом во временном каталоге, заполненный size задачами."""
+
+    base_class = TaskManager.storage_class(engine)
+    suffix = "db" if engine == "sqlite" else "json"
+    storage_class = type(
+        base_class.__name__, (base_class,), {"_filename": os.path.join(workdir, f"tasks.{suffix}")}
+    )
+    tasks = list(generate_tasks(size, seed))
+    if engine == "sqlite":
+        storage = storage_class()
+        storage.import_tasks(tasks)
+        storage.close()
+    elif engine == "sharded":
+        storage_class().refresh(tasks)
+    else:
+        with open(storage_class._filename, "wb") as f:
+            f.write(serializers.dumps(tasks, storage_class._format))
+    return storage_class
+
+
+def run(engines: list[str], sizes: list[int], ops: int, write_ops: int, seed: int) -> list[dict]:
+    results = []
+    for engine in engines:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as workdir:
+                context = BenchContext(prepare_store(workdir, engine, size, seed), size, seed)
+                for name in READ_OPERATIONS + WRITE_OPERATIONS:
+                    count = write_ops if name in WRITE_OPERATIONS else ops
+                    if name == "delete_category":
+                        count = min(count, len(CATEGORIES) - 1)
+                    result = run_operation(getattr(context, name), count)
+                    results.append({"engine": engine, "size": size, "operation": name, **result})
+                    print(format_result(results[-1]), file=sys.stderr)
+                if (close := getattr(context.storage, "close", None)) is not None:
+                    close()
+    return results
+
+
+def format_result(result: dict[str, Any]) -> str:
+    return (
+        f"{result['engine']:>8} {result['size']:>8} {result['operation']:<16} "
+        f"{result['throughput']:>10.1f} оп/с  p50 {result['p50_ms']:>9.3f} мс  "
+        f"p95 {result['p95_ms']:>9.3f} мс  p99 {result['p99_ms']:>9.3f} мс  "
+        f"память {result['peak_mb']:>8.2f} МБ"
+    )
+
+
+def compare(results: list[dict], baseline: dict[str, Any]) -> None:
+    """Сравнение медианной задержки с сохраненными результатами."""
+
+    previous = {
+        (result["engine"], result["size"], result["operation"]): result
+        for result in baseline["results"]
+    }
+    print(f"Сравнение с {baseline['meta'].get('commit') or 'сохраненными результатами'}:")
+    for result in results:
+        old = previous.get((result["engine"], result["size"], result["operation"]))
+        if old is None or not old["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"]
+        mark = "  РЕГРЕССИЯ" if ratio > REGRESSION_RATIO else ""
+        print(
+            f"{result['engine']:>8} {result['size']:>8} {result['operation']:<16} "
+            f"p50 {old['p50_ms']:>9.3f} -> {result['p50_ms']:>9.3f} мс (x{ratio:.2f}){mark}"
+        )
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--engines", nargs="+", default=["json", "journal", "sharded", "sqlite"])
+    parser.add_argument("--ops", type=int, default=20, help="повторов операций чтения")
+    parser.add_argument("--write-ops", type=int, default=5, help="повторов операций записи")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="результаты предыдущего запуска в JSON")
+    args = parser.parse_args()
+    results = run(args.engines, args.sizes, args.ops, args.write_ops, args.seed)
+    report = {
+        "meta": {
+            "commit": current_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import random
+import datetime as dt
+from typing import Any, Iterator
+
+CATEGORIES = ("Работа", "Дом", "Обучение", "Здоровье", "Покупки", "Finance", "Travel")
+PRIORITIES = ("Низкий", "Средний", "Высокий")
+STATUSES = ("Не выполнена", "Выполнена")
+# шаблоны названий: действие + объект, русские и английские в пропорции примерно 2 к 1.
+ACTIONS = (
+    "Подготовить",
+    "Проверить",
+    "Обновить",
+    "Купить",
+    "Изучить",
+    "Позвонить по поводу",
+    "Записаться на",
+    "Разобрать",
+    "Review",
+    "Deploy",
+    "Fix",
+    "Plan",
+)
+OBJECTS = (
+    "отчет",
+    "встреча",
+    "проект",
+    "документация",
+    "продукты",
+    "счет за квартиру",
+    "тренировка",
+    "курс python",
+    "release notes",
+    "pull request",
+    "invoice",
+    "backup",
+    "fastapi service",
+    "trip budget",
+)
+WORDS = (
+    "отчет",
+    "встреча",
+    "проект",
+    "купить",
+    "изучить",
+    "позвонить",
+    "документация",
+    "срочно",
+    "клиент",
+    "review",
+    "deploy",
+    "release",
+    "meeting",
+    "invoice",
+    "backup",
+    "python",
+    "fastapi",
+)
+
+
+def generate_title(rnd: random.Random) -> str:
+    title = f"{rnd.choice(ACTIONS)} {rnd.choice(OBJECTS)}"
+    if rnd.random() < 0.3:
+        title += f" {rnd.choice(WORDS)}"
+    return title
+
+
+def generate_tasks(count: int, seed: int = 0) -> Iterator[dict[str, Any]]:
+    """Детерминированный генератор задач для бенчмарков."""
+
+    rnd = random.Random(seed)
+    start = dt.date(2025, 1, 1).toordinal()
+    for task_id in range(1, count + 1):
+        yield {
+            "id": task_id,
+            "title": generate_title(rnd),
+            "description": " ".join(rnd.choices(WORDS, k=rnd.randint(5, 12))),
+            "category": rnd.choice(CATEGORIES),
+            "due_date": dt.date.fromordinal(start + rnd.randint(0, 730)).isoformat(),
+            "priority": rnd.choice(PRIORITIES),
+            "status": rnd.choice(STATUSES),
+        }
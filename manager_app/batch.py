@@ -0,0 +1,120 @@
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from .exceptions import InvalidCommand, InvalidInputData, DataDoesNotExists
+
+
+@dataclass
+class BatchReport:
+    """Итог пакетного выполнения: количество примененных команд и ошибки по строкам."""
+
+    applied: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.applied / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Выполнено команд: {self.applied}, ошибок: {len(self.errors)}, "
+            f"время: {self.elapsed:.3f} с, скорость: {self.throughput:.0f} команд/с"
+        )
+
+
+class BatchExecutor:
+    """
+    Неинтерактивное выполнение команд TaskManager из потока JSON строк, например:
+        {"command": "add task", "title": "...", "description": "...", "category": "...",
+         "due_date": "2099-01-01", "priority": "высокий"}
+        {"command": "edit task", "id": 1, "field": "status", "value": "выполнена"}
+        {"command": "done task", "id": 1}
+        {"command": "delete task", "by": "category", "value": "Работа"}
+    Данные проверяются теми же правилами, что и при вводе в консоли. Команды
+    применяются к хранилищу в одной транзакции с однократным сохранением в конце.
+    """
+
+    BATCH_COMMANDS = ("add task", "edit task", "done task", "delete task")
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+
+    def execute(self, lines: Iterable[str]) -> BatchReport:
+        report = BatchReport()
+        start = time.perf_counter()
+        with self.manager.storage.transaction():
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    self._execute_record(self._parse(line))
+                except (InvalidInputData, DataDoesNotExists, InvalidCommand) as exc:
+                    report.errors.append((line_number, str(exc)))
+                else:
+                    report.applied += 1
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _parse(line: str) -> dict[str, Any]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise InvalidInputData(f"Неудалось считать переданные данные {line.strip()}")
+        if not isinstance(record, dict):
+            raise InvalidInputData(f"Неудалось считать переданные данные {line.strip()}")
+        return record
+
+    def _execute_record(self, record: dict[str, Any]) -> None:
+        command = str(record.get("command", "")).lower()
+        if command not in self.BATCH_COMMANDS:
+            raise InvalidCommand(f"Неизвестная команда: '{command}'.")
+        try:
+            getattr(self, command.replace(" ", "_"))(record)
+        except KeyError as exc:
+            raise InvalidInputData(f"В команде '{command}' не указано поле {exc}")
+
+    def _task_id(self, record: dict[str, Any]) -> int:
+        return int(self.manager._check_input_data(str(record["id"]), self.manager.ID_PATTERN))
+
+    def add_task(self, record: dict[str, Any]) -> None:
+        manager = self.manager
+        due_date = manager._check_input_data(str(record["due_date"]), manager.DATE_PATTERN)
+        priority = manager._check_input_data(
+            str(record["priority"]).capitalize(), manager.PRIORITY_PATTERN
+        )
+        manager._check_due_date(due_date)
+        manager.storage.add_task(
+            {
+                "id": None,
+                "title": str(record["title"]),
+                "description": str(record["description"]),
+                "category": str(record["category"]).capitalize(),
+                "due_date": due_date,
+                "priority": priority,
+                "status": "Не выполнена",
+            }
+        )
+
+    def edit_task(self, record: dict[str, Any]) -> None:
+        manager = self.manager
+        task_id = self._task_id(record)
+        task_key = manager._check_input_data(str(record["field"]), manager.TASK_KEY_PATTERN)
+        new_data = manager._check_edit_value(task_key, str(record["value"]))
+        manager.storage.edit_task((task_id, task_key, new_data))
+
+    def done_task(self, record: dict[str, Any]) -> None:
+        self.manager.storage.done_task(self._task_id(record))
+
+    def delete_task(self, record: dict[str, Any]) -> None:
+        delete_key = str(record["by"]).lower().removeprefix("by ")
+        if delete_key == "id":
+            data = ("id", self._task_id({"id": record["value"]}))
+        elif delete_key == "category":
+            data = ("category", str(record["value"]))
+        else:
+            raise InvalidCommand(f"Неизвестный критерий удаления: '{delete_key}'.")
+        self.manager.storage.delete_task(data)
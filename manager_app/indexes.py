@@ -0,0 +1,373 @@
+import re
+import bisect
+from itertools import islice
+from collections import Counter
+from operator import attrgetter, methodcaller
+from typing import Any, Iterable, Iterator
+
+from .task import Task
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashIndex:
+    """
+    Вторичный индекс равенства по полю задачи: значение -> задачи.
+    Задачи в корзине хранятся по id, выдаются в порядке возрастания id
+    (порядок хранилища), корзина пересортировывается только если порядок нарушен.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.fields = (key,)
+        # поля задачи читаются атрибутами, минуя интерфейс словаря.
+        self._value = attrgetter(key) if key in Task.FIELDS else methodcaller("get", key)
+        self._buckets: dict[Any, dict[int, dict[str, Any]]] = {}
+        self._unsorted: set[Any] = set()
+
+    def add(self, task: Task) -> None:
+        value = self._value(task)
+        bucket = self._buckets.get(value)
+        if bucket is None:
+            bucket = self._buckets[value] = {}
+        elif next(reversed(bucket)) > task.id:
+            self._unsorted.add(value)
+        bucket[task.id] = task
+
+    def add_many(self, tasks: Iterable[Task]) -> None:
+        """Добавление задач одним циклом, для построения индекса при загрузке."""
+
+        buckets, value_of = self._buckets, self._value
+        for task in tasks:
+            value, task_id = value_of(task), task.id
+            bucket = buckets.get(value)
+            if bucket is None:
+                bucket = buckets[value] = {}
+            elif next(reversed(bucket)) > task_id:
+                self._unsorted.add(value)
+            bucket[task_id] = task
+
+    def remove(self, task: Task) -> None:
+        value = self._value(task)
+        bucket = self._buckets.get(value)
+        if bucket is None:
+            return
+        bucket.pop(task.id, None)
+        if not bucket:
+            del self._buckets[value]
+            self._unsorted.discard(value)
+
+    def get(self, value: Any, max_return: int | None = None) -> list[dict[str, Any]]:
+        bucket = self._buckets.get(value)
+        if not bucket:
+            return []
+        if value in self._unsorted:
+            bucket = self._buckets[value] = dict(sorted(bucket.items()))
+            self._unsorted.discard(value)
+        tasks = bucket.values()
+        if max_return is None:
+            return list(tasks)
+        return [task for task, _ in zip(tasks, range(max_return))]
+
+    def count(self, value: Any) -> int:
+        return len(self._buckets.get(value, ()))
+
+    def iter_sorted(self) -> Iterator[dict[str, Any]]:
+        """Обход задач в порядке значений поля, внутри значения - в порядке id."""
+
+        for value in sorted(self._buckets, key=lambda value: (value is None, value or "")):
+            yield from self.get(value)
+
+
+class SortedKeys:
+    """
+    Отсортированный список ключей с отложенным удалением: удаленный ключ помечается
+    и пропускается при обходе, а из списка вычищается одним проходом, когда помеченных
+    становится больше половины. Поэтому удаление k ключей стоит O(k), а не O(k·n)
+    на сдвиги списка.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[tuple] = []
+        self._removed: set[tuple] = set()
+
+    def add(self, key: tuple) -> None:
+        if key in self._removed:
+            # ключ остался в списке, достаточно снять пометку.
+            self._removed.discard(key)
+        else:
+            bisect.insort(self._keys, key)
+
+    def extend(self, keys: Iterable[tuple]) -> None:
+        """Добавление с однократной сортировкой, для построения индекса при загрузке."""
+
+        self._keys.extend(keys)
+        self._keys.sort()
+
+    def discard(self, key: tuple) -> None:
+        """Помечает удаленным ключ, который есть в списке."""
+
+        self._removed.add(key)
+        if len(self._removed) > len(self._keys) // 2:
+            self._keys = [key for key in self._keys if key not in self._removed]
+            self._removed.clear()
+
+    def _bounds(self, start: tuple | None, stop: tuple | None) -> tuple[int, int]:
+        low = 0 if start is None else bisect.bisect_left(self._keys, start)
+        high = len(self._keys) if stop is None else bisect.bisect_left(self._keys, stop)
+        return low, max(low, high)
+
+    def count(self, start: tuple | None = None, stop: tuple | None = None) -> int:
+        """Количество ключей в полуинтервале [start, stop), включая помеченные удаленными."""
+
+        low, high = self._bounds(start, stop)
+        return high - low
+
+    def iter(self, start: tuple | None = None, stop: tuple | None = None) -> Iterator[tuple]:
+        low, high = self._bounds(start, stop)
+        keys, removed = self._keys, self._removed
+        if not removed:
+            yield from islice(keys, low, high)
+            return
+        for position in range(low, high):
+            if (key := keys[position]) not in removed:
+                yield key
+
+
+class DueDateIndex:
+    """
+    Упорядоченный индекс сроков выполнения: отсортированные пары (порядковый номер дня, id)
+    всех задач и отдельно невыполненных, чтобы выборка просроченных не перебирала
+    выполненные задачи. Границы диапазона находятся двоичным поиском,
+    задачи без даты в формате 'YYYY-MM-DD' в индекс не попадают.
+    """
+
+    fields = ("due_date", "status")
+    DONE = "Выполнена"
+
+    def __init__(self) -> None:
+        self._all = SortedKeys()
+        self._open = SortedKeys()
+        self._tasks: dict[int, Task] = {}
+
+    def add(self, task: Task) -> None:
+        if (ordinal := task.due_ordinal) is None:
+            return
+        key = (ordinal, task.id)
+        self._all.add(key)
+        if task.status != self.DONE:
+            self._open.add(key)
+        self._tasks[task.id] = task
+
+    def add_many(self, tasks: Iterable[Task]) -> None:
+        """Добавление с однократной сортировкой, для построения индекса при загрузке."""
+
+        all_keys, open_keys = [], []
+        for task in tasks:
+            if (ordinal := task.due_ordinal) is not None:
+                key = (ordinal, task.id)
+                all_keys.append(key)
+                if task.status != self.DONE:
+                    open_keys.append(key)
+                self._tasks[task.id] = task
+        self._all.extend(all_keys)
+        self._open.extend(open_keys)
+
+    def remove(self, task: Task) -> None:
+        if (ordinal := task.due_ordinal) is None or self._tasks.pop(task.id, None) is None:
+            return
+        # статус в индексе актуален, поэтому по нему видно, есть ли ключ среди невыполненных.
+        key = (ordinal, task.id)
+        self._all.discard(key)
+        if task.status != self.DONE:
+            self._open.discard(key)
+
+    def count_range(self, start: int | None = None, stop: int | None = None) -> int:
+        """Оценка сверху количества задач со сроком в полуинтервале [start, stop)."""
+
+        return self._all.count(*self._bounds(start, stop))
+
+    def iter_range(
+        self, start: int | None = None, stop: int | None = None, open_only: bool = False
+    ) -> Iterator[Task]:
+        """
+        Задачи со сроком в полуинтервале [start, stop) в порядке срока, затем id.
+        open_only - только невыполненные задачи.
+        """
+
+        keys = self._open if open_only else self._all
+        for _, task_id in keys.iter(*self._bounds(start, stop)):
+            yield self._tasks[task_id]
+
+    @staticmethod
+    def _bounds(start: int | None, stop: int | None) -> tuple[tuple | None, tuple | None]:
+        return None if start is None else (start,), None if stop is None else (stop,)
+
+
+class InvertedIndex:
+    """
+    Полнотекстовый индекс по полям 'title' и 'description':
+    токен -> {id задачи: (совпадений в title, совпадений в description)}.
+    Токен - непрерывная последовательность символов слова (\\w+), что совпадает
+    с поиском ключевого слова по шаблону \\bслово\\b.
+    """
+
+    fields = ("title", "description")
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[int, tuple[int, int]]] = {}
+
+    @staticmethod
+    def tokenize(text: str) -> Counter:
+        return Counter(TOKEN_PATTERN.findall(text))
+
+    def add(self, task: Task) -> None:
+        title_tokens = self.tokenize(task.title)
+        desc_tokens = self.tokenize(task.description)
+        for token in title_tokens.keys() | desc_tokens.keys():
+            self._postings.setdefault(token, {})[task.id] = (
+                title_tokens[token],
+                desc_tokens[token],
+            )
+
+    def remove(self, task: Task) -> None:
+        for token in TOKEN_PATTERN.findall(task.title) + TOKEN_PATTERN.findall(task.description):
+            if (posting := self._postings.get(token)) is not None:
+                posting.pop(task.id, None)
+                if not posting:
+                    del self._postings[token]
+
+    def search(self, keywords: Iterable[str]) -> list[tuple[int, int]]:
+        """
+        Возвращает (id, количество совпадений) для задач, содержащих ключевые слова.
+        Количество совпадений - максимум из совпадений в title и description.
+        """
+
+        title_counts, desc_counts = Counter(), Counter()
+        for token in set(keywords):
+            for task_id, (title_tf, desc_tf) in self._postings.get(token, {}).items():
+                title_counts[task_id] += title_tf
+                desc_counts[task_id] += desc_tf
+        return [
+            (task_id, max(title_counts[task_id], desc_counts[task_id])) for task_id in title_counts
+        ]
+
+    def dump(self) -> dict[str, list[list[int]]]:
+        return {
+            token: [[task_id, *counts] for task_id, counts in posting.items()]
+            for token, posting in self._postings.items()
+        }
+
+    @classmethod
+    def from_dump(cls, data: dict[str, list[list[int]]]) -> "InvertedIndex":
+        index = cls()
+        index._postings = {
+            token: {task_id: (title_tf, desc_tf) for task_id, title_tf, desc_tf in posting}
+            for token, posting in data.items()
+        }
+        return index
+
+
+class Aggregates:
+    """
+    Сводные счетчики задач: количество по сочетаниям (категория, статус, приоритет)
+    и невыполненных задач по (категория, срок) для подсчета просроченных на любую дату.
+    Обновляются за O(1) при каждом изменении задачи, сохраняются рядом с хранилищем.
+    При сохранении сроки раньше текущего дня сворачиваются в один счетчик на категорию
+    (день as_of - 1), поэтому восстановленные счетчики верны для дат не раньше as_of.
+    """
+
+    fields = ("category", "status", "priority", "due_date")
+    DONE = "Выполнена"
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.open_due: Counter = Counter()
+        self.as_of: int | None = None
+
+    def _keys(self, task: Task) -> tuple[tuple, tuple | None]:
+        category, status = task.category, task.status
+        open_due = None
+        if status != self.DONE and (ordinal := task.due_ordinal) is not None:
+            if self.as_of is not None and ordinal < self.as_of:
+                ordinal = self.as_of - 1
+            open_due = (category, ordinal)
+        return (category, status, task.priority), open_due
+
+    def add(self, task: Task) -> None:
+        counts_key, open_due_key = self._keys(task)
+        self.counts[counts_key] += 1
+        if open_due_key is not None:
+            self.open_due[open_due_key] += 1
+
+    def add_many(self, tasks: Iterable[Task]) -> None:
+        for task in tasks:
+            self.add(task)
+
+    def remove(self, task: Task) -> None:
+        counts_key, open_due_key = self._keys(task)
+        for counter, key in ((self.counts, counts_key), (self.open_due, open_due_key)):
+            if key is not None and counter[key] > 0:
+                counter[key] -= 1
+                if not counter[key]:
+                    del counter[key]
+
+    def summary(self, today: int) -> dict[str, Any]:
+        """
+        Сводка по категориям и итог: всего, выполнено, невыполненные по приоритетам,
+        просрочено (срок раньше дня today) и доля выполненных.
+        """
+
+        categories: dict[str, dict[str, Any]] = {}
+        total = self._empty_row()
+        for (category, status, priority), count in sorted(
+            self.counts.items(), key=lambda item: tuple(str(value) for value in item[0])
+        ):
+            row = categories.setdefault(category, self._empty_row())
+            for target in (row, total):
+                target["total"] += count
+                if status == self.DONE:
+                    target["done"] += count
+                else:
+                    target["open_by_priority"][priority] = (
+                        target["open_by_priority"].get(priority, 0) + count
+                    )
+        for (category, ordinal), count in self.open_due.items():
+            if ordinal < today:
+                categories[category]["overdue"] += count
+                total["overdue"] += count
+        for row in (*categories.values(), total):
+            row["completion_rate"] = row["done"] / row["total"] if row["total"] else 0.0
+        return {"categories": categories, "total": total}
+
+    @staticmethod
+    def _empty_row() -> dict[str, Any]:
+        return {"total": 0, "done": 0, "overdue": 0, "open_by_priority": {}}
+
+    def dump(self, today: int) -> dict[str, Any]:
+        open_due: dict[Any, dict[int, int]] = {}
+        for (category, ordinal), count in self.open_due.items():
+            dates = open_due.get(category)
+            if dates is None:
+                dates = open_due[category] = {}
+            ordinal = max(ordinal, today - 1)
+            dates[ordinal] = dates.get(ordinal, 0) + count
+        return {
+            "as_of": today,
+            "counts": [[*key, count] for key, count in self.counts.items()],
+            "open_due": [[category, list(dates.items())] for category, dates in open_due.items()],
+        }
+
+    @classmethod
+    def from_dump(cls, data: dict[str, Any]) -> "Aggregates":
+        aggregates = cls()
+        aggregates.as_of = data["as_of"]
+        aggregates.counts = Counter({tuple(item[:-1]): item[-1] for item in data["counts"]})
+        aggregates.open_due = Counter(
+            {
+                (category, ordinal): count
+                for category, dates in data["open_due"]
+                for ordinal, count in dates
+            }
+        )
+        return aggregates
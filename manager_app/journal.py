@@ -0,0 +1,162 @@
+import os
+from typing import Any
+
+from . import serializers
+from .task import Task
+from .indexes import Aggregates
+from .locking import atomic_write
+from .metrics import metrics, timed
+from .storage import TaskStorage, mutation
+
+
+class JournaledTaskStorage(TaskStorage):
+    """
+    Хранилище задач с журналом упреждающей записи.
+    Мутации дописываются компактными записями в журнал (tasks.json.log),
+    снимок (tasks.json) пересобирается когда журнал превышает порог размера.
+    При старте состояние восстанавливается из снимка и проигрывания журнала.
+    """
+
+    _compact_threshold = 4 * 1024 * 1024
+    _append_only = True
+    _streaming_reads = False
+
+    @property
+    def _journal_filename(self) -> str:
+        return f"{self._filename}.log"
+
+    def _file_signature(self) -> tuple[int, ...] | None:
+        try:
+            stat = os.stat(self._journal_filename)
+        except FileNotFoundError:
+            return super()._file_signature()
+        return *(super()._file_signature() or ()), stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> list[Task] | list:
+        try:
+            storage_data = super()._load()
+        except FileNotFoundError:
+            if not os.path.exists(self._journal_filename):
+                raise
+            storage_data = []
+        return self._replay(storage_data)
+
+    def _replay(self, storage_data: list[Task]) -> list[Task]:
+        """
+        Проигрывает журнал поверх снимка. Оборванная последняя запись
+        (например, после падения процесса) отбрасывается, из файла ее удаляет
+        следующая запись в журнал под блокировкой.
+        """
+
+        tasks = {task.id: task for task in storage_data}
+        try:
+            f = open(self._journal_filename, "rb")
+        except FileNotFoundError:
+            return storage_data
+        with f:
+            for line in f:
+                metrics.incr("storage.bytes_read", len(line))
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Оборванная запись журнала")
+                    op, payload = serializers.loads(line)
+                except serializers.DECODE_ERRORS:
+                    break
+                if op == "put":
+                    tasks[payload["id"]] = Task(payload)
+                else:
+                    for task_id in payload:
+                        tasks.pop(task_id, None)
+        return list(tasks.values())
+
+    @staticmethod
+    def _truncate_torn_tail(f) -> None:
+        """Удаляет из журнала оборванную последнюю запись, вызывается под блокировкой."""
+
+        end = position = f.seek(0, os.SEEK_END)
+        valid_offset = 0
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                valid_offset = start + newline + 1
+                break
+            position = start
+        if valid_offset != end:
+            f.truncate(valid_offset)
+
+    def _append(self, changes: list[tuple[str, Any]]) -> int:
+        records = b"".join(serializers.dumps(change, "compact") + b"\n" for change in changes)
+        with open(self._journal_filename, "a+b") as f:
+            self._truncate_torn_tail(f)
+            # запись одним вызовом, чтобы не перемежать частичные записи.
+            f.write(records)
+            metrics.incr("storage.bytes_written", len(records))
+            f.flush()
+            if self._fsync:
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def _persist(self, storage_data: list[Task], changes: list[tuple[str, Any]]) -> None:
+        """Дописывает изменения в журнал, кеш остается актуальным."""
+
+        journal_size = self._append(changes)
+        self._signature = self._file_signature()
+        if journal_size > self._compact_threshold:
+            self.compact()
+
+    def refresh(self, storage_data: list[dict[str]]) -> None:
+        """Атомарно записывает снимок и очищает журнал."""
+
+        raw = serializers.dumps(storage_data, self._format)
+        atomic_write(self._filename, raw, fsync=True)
+        metrics.incr("storage.bytes_written", len(raw))
+        # повторное проигрывание записей поверх нового снимка идемпотентно,
+        # поэтому падение между replace и очисткой журнала не портит данные.
+        with open(self._journal_filename, "w"):
+            pass
+
+    def _aggregates_after(self, stats: dict[str, Any], aggregates: Aggregates) -> Aggregates | None:
+        """
+        Добавление задачи без загрузки хранилища не перезаписывает сводные счетчики,
+        они досчитываются по дописанным после них записям журнала. Если среди записей
+        есть изменения или удаления существующих задач, нужна загрузка хранилища (None).
+        """
+
+        signature, current = stats["signature"], self._file_signature()
+        # снимок и файл журнала те же, журнал только дописывался.
+        if (
+            current is None
+            or len(signature) != len(current)
+            or signature[:-2] != list(current[:-2])
+            or signature[-1] > current[-1]
+            or not os.path.exists(self._journal_filename)
+        ):
+            return None
+        last_id = stats["last_id"]
+        with open(self._journal_filename, "rb") as f:
+            f.seek(signature[-1])
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Оборванная запись журнала")
+                    op, payload = serializers.loads(line)
+                except serializers.DECODE_ERRORS:
+                    break
+                if op != "put" or payload["id"] <= last_id:
+                    return None
+                last_id = payload["id"]
+                aggregates.add(Task(payload))
+        return aggregates
+
+    @timed
+    @mutation
+    def compact(self) -> None:
+        """Сворачивает журнал в новый снимок."""
+
+        storage_data = self.cache
+        self.refresh(storage_data)
+        self._signature = self._file_signature()
+        self._write_header(self._last_id, len(storage_data))
+        self._save_text_index()
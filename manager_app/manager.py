@@ -1,11 +1,12 @@
+import os
 import re
 import sys
+import argparse
+import importlib
 import datetime as dt
 from typing import Any
 
-from prettytable import PrettyTable
-
-from .storage import TaskStorage
+from .metrics import metrics
 from .exceptions import InvalidCommand, InvalidInputData, DataDoesNotExists
 
 
@@ -20,6 +21,10 @@ class TaskManager:
         "delete task",
         "search tasks",
         "done task",
+        "agenda",
+        "overdue",
+        "summary",
+        "stats",
         "cmd",
         "leave",
     )
@@ -27,28 +32,63 @@ class TaskManager:
         "show_tasks": ("all", "by category"),
         "edit_task": ("payload", "status"),
         "delete_task": ("by id", "by category"),
-        "search_tasks": ("by keywords", "by category", "by status"),
+        "search_tasks": ("by keywords", "by category", "by status", "by query"),
+        "stats": ("table", "json", "prometheus"),
     }
     COMMANDS_DESCRIPTION = (
         "Просмотр всех задач или по категориям",
         "Добавление новой задачи",
         "Редактирование задачи",
         "Удаление задачи по идентификатору или категории",
-        "Поиск по ключевым словам, категории или статусу выполнения",
+        "Поиск по ключевым словам, категории, статусу выполнения или составному запросу",
         "Отметить задачу как 'Выполненая'",
+        "Невыполненные задачи со сроком в ближайшие дни",
+        "Просроченные задачи",
+        "Сводка по категориям: количество, невыполненные по приоритетам, просроченные",
+        "Статистика времени выполнения команд и операций хранилища",
         "Посмотреть список команд",
         "Завершить работу менеджера",
     )
+    # модули движков импортируются только при обращении к хранилищу, чтобы не замедлять старт.
+    STORAGE_ENGINES = {
+        "json": "storage.TaskStorage",
+        "journal": "journal.JournaledTaskStorage",
+        "sqlite": "sqlite_storage.SQLiteTaskStorage",
+        "sharded": "sharded.ShardedTaskStorage",
+        # тонкий клиент сервиса manager_app.server, адрес в TASK_SERVER_ADDRESS.
+        "server": "server.TaskClient",
+    }
+    ID_PATTERN = r"[0-9]+"
+    DATE_PATTERN = r"[0-9]{4}-[0-9]{2}-[0-9]{2}"
+    PRIORITY_PATTERN = r"Низкий|Средний|Высокий"
+    STATUS_PATTERN = r"Выполнена|Не выполнена"
+    TASK_KEY_PATTERN = r"\b(title|description|category|priority|status|due_date)\b"
+    PAGE_SIZE = 20
+    AGENDA_DAYS = 7
+    # движок хранилища выбирается переменной окружения TASK_STORAGE_ENGINE.
+    storage_engine = os.environ.get("TASK_STORAGE_ENGINE", "json")
 
     @property
     def storage(self):
         if hasattr(self, "_storage"):
             return self._storage
-        self._storage = TaskStorage()
+        self._storage = self.storage_class(self.storage_engine)()
         return self._storage
 
-    @staticmethod
-    def leave() -> None:
+    @classmethod
+    def storage_class(cls, engine: str) -> type:
+        try:
+            module_name, class_name = cls.STORAGE_ENGINES[engine].rsplit(".", 1)
+        except KeyError:
+            raise ValueError(f"Неизвестный движок хранилища: '{engine}'")
+        return getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+
+    def leave(self) -> None:
+        if hasattr(self, "_storage"):
+            # при групповом коммите отложенные изменения сохраняются до выхода.
+            self.storage.close()
+        if metrics_file := os.environ.get("TASK_METRICS_FILE"):
+            metrics.export(metrics_file)
         print("РАБОТА МЕНЕДЖЕРА ЗАДАЧ ОСТАНОВЛЕНА.")
         sys.exit()
 
@@ -62,7 +102,8 @@ class TaskManager:
         )
 
     def command_execute(self) -> None:
-        getattr(self, self._current_cmd)()
+        with metrics.timer(f"command.{self._current_cmd}"), metrics.profile():
+            getattr(self, self._current_cmd)()
 
     @staticmethod
     def _check_input_data(data: str, pattern: str) -> str:
@@ -82,9 +123,20 @@ class TaskManager:
                 f"Невалидный формат даты {date}. Используйте шаблон в подсказке ввода."
             )
 
+    def _check_edit_value(self, task_key: str, new_data: str) -> str:
+        if task_key == "priority":
+            new_data = self._check_input_data(new_data.capitalize(), self.PRIORITY_PATTERN)
+        elif task_key == "status":
+            new_data = self._check_input_data(new_data.capitalize(), self.STATUS_PATTERN)
+        elif task_key == "due_date":
+            new_data = self._check_input_data(new_data, self.DATE_PATTERN)
+            self._check_due_date(new_data)
+        return new_data
+
     def search_tasks(self) -> None:
         search_indicator = input(
-            "Укажите критерий по которым искать задачи 'by keywords', 'by category', 'by status': "
+            "Укажите критерий по которым искать задачи "
+            "'by keywords', 'by category', 'by status', 'by query': "
         )
         self.check_command(
             search_indicator.lower(), self.VALID_SUBCOMMANDS_MAP.get(self._current_cmd)
@@ -94,43 +146,152 @@ class TaskManager:
             data = ("category", category)
         elif "by status" in search_indicator:
             status = self._check_input_data(
-                input("Укажите статус: ").capitalize(), r"Выполнена|Не выполнена"
+                input("Укажите статус: ").capitalize(), self.STATUS_PATTERN
             )
             data = ("status", status)
+        elif "by query" in search_indicator:
+            query = self._parse_query(
+                input(
+                    "Перечислите условия через ';', например: category=Работа; "
+                    "priority=Высокий,Средний; due_date=2024-12-01..2024-12-31; "
+                    "keywords=отчет план; sort=-due_date; limit=10: "
+                )
+            )
         else:
             keywords = input("Перечислите ключевые слова через пробел: ").split(" ")
             data = ("keywords", keywords)
         head = ["ID", "TITLE", "DESCRIPTION", "CATEGORY", "DUE_DATE", "PRIORITY", "STATUS"]
-        search_result = [tuple(task.values()) for task in self.storage.search_task(data)]
+        if "by query" in search_indicator:
+            tasks = self.storage.query(**query)
+        else:
+            tasks = self.storage.search_task(data)
+        search_result = [tuple(task.values()) for task in tasks]
         print(self.output_table(head, search_result))
 
+    def _parse_query(self, text: str) -> dict[str, Any]:
+        """
+        Разбор составного запроса 'поле=значение; ...' в аргументы TaskStorage.query.
+        Значение 'a,b' - любое из перечисленных, 'a..b' - диапазон (границу можно опустить),
+        keywords - ключевые слова через пробел, sort - поля через запятую ('-' - по убыванию),
+        limit и offset - размер и смещение выборки.
+        """
+
+        query = {"filters": {}}
+        for part in filter(None, (part.strip() for part in text.split(";"))):
+            key, separator, value = (item.strip() for item in part.partition("="))
+            if not separator or not value:
+                raise InvalidInputData(f"Неудалось считать условие {part}")
+            if key in ("limit", "offset"):
+                query[key] = int(self._check_input_data(value, self.ID_PATTERN))
+            elif key == "sort":
+                sort_key = [item.strip() for item in value.split(",")]
+                for item in sort_key:
+                    self._check_input_data(item.removeprefix("-"), f"id|{self.TASK_KEY_PATTERN}")
+                query["sort_key"] = sort_key
+            elif key == "keywords":
+                query["filters"][key] = value.split()
+            else:
+                self._check_input_data(key, f"id|{self.TASK_KEY_PATTERN}")
+                query["filters"][key] = self._parse_query_value(key, value)
+        return query
+
+    def _parse_query_value(self, key: str, value: str) -> Any:
+        if ".." in value:
+            start, _, end = value.partition("..")
+            bounds = (("from", start.strip()), ("to", end.strip()))
+            return {bound: self._parse_query_item(key, item) for bound, item in bounds if item}
+        if "," in value:
+            return [self._parse_query_item(key, item.strip()) for item in value.split(",")]
+        return self._parse_query_item(key, value)
+
+    def _parse_query_item(self, key: str, item: str) -> Any:
+        if key == "id":
+            return int(self._check_input_data(item, self.ID_PATTERN))
+        if key in ("category", "priority", "status"):
+            return item.capitalize()
+        return item
+
     def show_tasks(self) -> None:
+        """Постраничный вывод задач, ширина колонок рассчитывается по текущей странице."""
+
+        head = ["ID", "TITLE", "DESCRIPTION", "CATEGORY", "DUE_DATE", "PRIORITY", "STATUS"]
+        page = 0
+        while True:
+            # запрашивается на одну задачу больше, чтобы узнать о наличии следующей страницы.
+            result = [
+                tuple(task.values())
+                for task in self.storage.iter_tasks(page * self.PAGE_SIZE, self.PAGE_SIZE + 1)
+            ]
+            has_next = len(result) > self.PAGE_SIZE
+            print(self.output_table(head, result[: self.PAGE_SIZE]))
+            if not has_next and not page:
+                return
+            action = input(
+                f"Страница {page + 1}. 'n' - следующая, 'p' - предыдущая, Enter - выход: "
+            ).lower()
+            if action == "n" and has_next:
+                page += 1
+            elif action == "p" and page:
+                page -= 1
+            elif action not in ("n", "p"):
+                return
+
+    def agenda(self) -> None:
+        days = input(f"Укажите количество дней (Enter - {self.AGENDA_DAYS}): ")
+        days = int(self._check_input_data(days or str(self.AGENDA_DAYS), self.ID_PATTERN))
+        today = dt.date.today()
+        tasks = self.storage.due_tasks(
+            today.isoformat(),
+            (today + dt.timedelta(days=days - 1)).isoformat(),
+            status="Не выполнена",
+        )
         head = ["ID", "TITLE", "DESCRIPTION", "CATEGORY", "DUE_DATE", "PRIORITY", "STATUS"]
-        result = [tuple(task.values()) for task in self.storage.show_tasks()]
-        print(self.output_table(head, result))
+        print(self.output_table(head, [tuple(task.values()) for task in tasks]))
+
+    def overdue(self) -> None:
+        head = ["ID", "TITLE", "DESCRIPTION", "CATEGORY", "DUE_DATE", "PRIORITY", "STATUS"]
+        tasks = self.storage.overdue_tasks()
+        print(self.output_table(head, [tuple(task.values()) for task in tasks]))
+
+    def summary(self) -> None:
+        summary = self.storage.summary()
+        priorities = ("Высокий", "Средний", "Низкий")
+        rows = [
+            (
+                category,
+                row["total"],
+                row["done"],
+                *(row["open_by_priority"].get(priority, 0) for priority in priorities),
+                row["overdue"],
+                f"{row['completion_rate']:.0%}",
+            )
+            for category, row in [*summary["categories"].items(), ("ВСЕГО", summary["total"])]
+        ]
+        head = [
+            "КАТЕГОРИЯ",
+            "ВСЕГО",
+            "ВЫПОЛНЕНО",
+            *(f"ОТКРЫТО: {priority.upper()}" for priority in priorities),
+            "ПРОСРОЧЕНО",
+            "ВЫПОЛНЕНИЕ",
+        ]
+        print(self.output_table(head, rows))
 
     def edit_task(self) -> None:
-        task_id = self._check_input_data(input("Укажите id задачи: "), r"[0-9]+")
+        task_id = self._check_input_data(input("Укажите id задачи: "), self.ID_PATTERN)
         task_key = self._check_input_data(
             input(
                 "Укажите поле которое требуется изменить "
                 "(title, description, category, due_date, priority, status): "
             ),
-            r"\b(title|description|category|priority|status|due_date)\b",
+            self.TASK_KEY_PATTERN,
         )
-        new_data = input("Укажите новое значение: ")
-        if task_key == "priority":
-            new_data = self._check_input_data(new_data.capitalize(), r"Низкий|Средний|Высокий")
-        elif task_key == "status":
-            new_data = self._check_input_data(new_data.capitalize(), r"Выполнена|Не выполнена")
-        elif task_key == "due_date":
-            new_data = self._check_input_data(new_data, r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
-            self._check_due_date(new_data)
+        new_data = self._check_edit_value(task_key, input("Укажите новое значение: "))
         self.storage.edit_task((int(task_id), task_key, new_data))
         print(f"Задача {task_id} обновлена")
 
     def done_task(self) -> None:
-        task_id = self._check_input_data(input("Укажите id задачи: "), r"[0-9]+")
+        task_id = self._check_input_data(input("Укажите id задачи: "), self.ID_PATTERN)
         self.storage.done_task(int(task_id))
         print(f"Задача {task_id} завершена")
 
@@ -140,11 +301,11 @@ class TaskManager:
         task_category = input("Введите название категории задачи: ").capitalize()
         task_due_date = self._check_input_data(
             input("Введите срок выполнения задачи в формате '2024-11-30': "),
-            r"[0-9]{4}-[0-9]{2}-[0-9]{2}",
+            self.DATE_PATTERN,
         )
         task_priorty = self._check_input_data(
             input("Укажите приоритет задачи: 'низкий/средний/высокий': ").capitalize(),
-            r"Низкий|Средний|Высокий",
+            self.PRIORITY_PATTERN,
         )
         self._check_due_date(task_due_date)
         self.storage.add_task(
@@ -164,7 +325,7 @@ class TaskManager:
         delete_key = input("Укажите критерий по которому удалять задачи 'by id или by category': ")
         self.check_command(delete_key.lower(), self.VALID_SUBCOMMANDS_MAP.get(self._current_cmd))
         if 'by id' == delete_key:
-            id = self._check_input_data(input("Укажите id задачи: "), r"[0-9]+")
+            id = self._check_input_data(input("Укажите id задачи: "), self.ID_PATTERN)
             data = ("id", int(id))
             msg = f"Задача с {id} успешно удалена."
         else:
@@ -175,10 +336,43 @@ class TaskManager:
         print(msg)
 
     def output_table(self, head: list[str], rows: list[tuple[Any]]) -> str:
-        table = PrettyTable()
-        table.field_names = head
-        table.add_rows(rows)
-        return table
+        from prettytable import PrettyTable
+
+        with metrics.timer("render.table"):
+            table = PrettyTable()
+            table.field_names = head
+            table.add_rows(rows)
+            return table.get_string()
+
+    def stats(self) -> None:
+        output_format = input("Укажите формат 'table', 'json' или 'prometheus' (Enter - table): ")
+        output_format = output_format.lower() or "table"
+        self.check_command(output_format, self.VALID_SUBCOMMANDS_MAP.get(self._current_cmd))
+        if output_format == "json":
+            print(metrics.to_json())
+            return
+        if output_format == "prometheus":
+            print(metrics.to_prometheus(), end="")
+            return
+        snapshot = metrics.snapshot()
+        print(
+            self.output_table(
+                ["ОПЕРАЦИЯ", "ВЫЗОВОВ", "ВСЕГО, МС", "СРЕДНЕЕ, МС", "МАКСИМУМ, МС"],
+                [
+                    (
+                        name,
+                        timer["count"],
+                        f"{timer['total_s'] * 1000:.3f}",
+                        f"{timer['total_s'] * 1000 / timer['count']:.3f}",
+                        f"{timer['max_s'] * 1000:.3f}",
+                    )
+                    for name, timer in snapshot["timers"].items()
+                ],
+            )
+        )
+        print(self.output_table(["СЧЕТЧИК", "ЗНАЧЕНИЕ"], list(snapshot["counters"].items())))
+        if profile_report := metrics.profile_report():
+            print(profile_report)
 
     def cmd(self) -> None:
         print(
@@ -203,7 +397,36 @@ class TaskManager:
                 except (InvalidInputData, DataDoesNotExists, InvalidCommand) as exc:
                     print(exc)
 
+    def run_batch(self, lines) -> None:
+        from .batch import BatchExecutor
+
+        report = BatchExecutor(self).execute(lines)
+        self.storage.flush()
+        for line_number, error in report.errors:
+            print(f"Строка {line_number}: {error}", file=sys.stderr)
+        print(report)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Консольный менеджер задач.")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="выполнить команды из файла JSON строк ('-' - из стандартного ввода)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="профилировать команды cProfile (отчет выводит команда stats)",
+    )
+    args = parser.parse_args()
+    if args.profile:
+        metrics.enable_profiling()
     task_manager = TaskManager()
-    task_manager.start()
+    if args.batch is None:
+        task_manager.start()
+    elif args.batch == "-":
+        task_manager.run_batch(sys.stdin)
+    else:
+        with open(args.batch, "r") as f:
+            task_manager.run_batch(f)
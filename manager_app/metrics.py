@@ -0,0 +1,167 @@
+"""
+Метрики процесса: таймеры (количество вызовов, суммарное и максимальное время)
+и счетчики событий (прочитано/записано байт, просмотрено задач, попадания в кеш,
+чтения файла потоком).
+Таймеры команд менеджера называются 'command.<команда>', операций хранилища -
+'storage.<метод>'. Метрики выводятся командой 'stats' и экспортируются в JSON или
+текстовый формат Prometheus, при заданной переменной TASK_METRICS_FILE - в файл при выходе
+(.json или .prom по расширению). Профилирование команд cProfile включается переменной
+TASK_MANAGER_PROFILE=1 или флагом --profile.
+"""
+
+import io
+import os
+import json
+import time
+import inspect
+import functools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable
+
+
+class Metrics:
+    """Реестр таймеров и счетчиков, общий для менеджера и хранилищ процесса."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.timers: dict[str, list[float]] = {}
+        self.counters: Counter = Counter()
+        # cProfile и pstats импортируются только при включении профилирования.
+        self.profiler = None
+        if os.environ.get("TASK_MANAGER_PROFILE") == "1":
+            self.enable_profiling()
+
+    def record(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += elapsed
+            timer[2] = max(timer[2], elapsed)
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @contextmanager
+    def profile(self):
+        """Профилирует блок, если профилирование включено."""
+
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def enable_profiling(self) -> None:
+        import cProfile
+
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+
+    def profile_report(self, limit: int = 20) -> str:
+        import pstats
+
+        if self.profiler is None:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+        if self.profiler is not None:
+            self.profiler = None
+            self.enable_profiling()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "timers": {
+                    name: {"count": count, "total_s": total, "max_s": longest}
+                    for name, (count, total, longest) in sorted(self.timers.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "task_manager") -> str:
+        snapshot = self.snapshot()
+        lines = []
+        for metric, kind, field in (
+            ("calls_total", "counter", "count"),
+            ("seconds_total", "counter", "total_s"),
+            ("seconds_max", "gauge", "max_s"),
+        ):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, timer in snapshot["timers"].items():
+                lines.append(f'{prefix}_{metric}{{name="{name}"}} {timer[field]}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snapshot["counters"].items():
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, filename: str) -> None:
+        """Записывает метрики в файл: Prometheus для .prom, иначе JSON."""
+
+        data = self.to_prometheus() if filename.endswith(".prom") else self.to_json()
+        with open(filename, "w") as f:
+            f.write(data)
+
+
+metrics = Metrics()
+
+
+def timed(method: Callable) -> Callable:
+    """
+    Учитывает время вызовов метода хранилища в таймере 'storage.<метод>'.
+    Для генераторов учитывается время выдачи элементов без времени их обработки
+    вызывающим кодом, вызов записывается при завершении или закрытии генератора.
+    """
+
+    name = f"storage.{method.__name__}"
+
+    if inspect.isgeneratorfunction(method):
+
+        @functools.wraps(method)
+        def generator_wrapper(*args, **kwargs):
+            elapsed = 0.0
+            iterator = method(*args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    yield item
+            finally:
+                iterator.close()
+                metrics.record(name, elapsed)
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with metrics.timer(name):
+            return method(*args, **kwargs)
+
+    return wrapper
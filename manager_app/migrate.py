@@ -0,0 +1,26 @@
+import argparse
+
+from . import serializers
+from .sqlite_storage import SQLiteTaskStorage
+
+
+def migrate_json_to_sqlite(json_filename: str, sqlite_filename: str) -> int:
+    """Переносит задачи из json хранилища в базу SQLite, id задач сохраняются."""
+
+    with open(json_filename, "rb") as f:
+        tasks = serializers.loads(f.read())
+    storage = SQLiteTaskStorage()
+    storage._filename = sqlite_filename
+    try:
+        return storage.import_tasks(tasks)
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перенос задач из tasks.json в SQLite.")
+    parser.add_argument("source", nargs="?", default="tasks.json")
+    parser.add_argument("target", nargs="?", default=SQLiteTaskStorage._filename)
+    args = parser.parse_args()
+    count = migrate_json_to_sqlite(args.source, args.target)
+    print(f"Перенесено задач: {count}")
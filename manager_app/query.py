@@ -0,0 +1,91 @@
+"""
+Составные запросы к хранилищу задач. Условия задаются словарем поле -> условие:
+    значение                          - равенство;
+    список значений                   - вхождение (IN);
+    {"from": начало, "to": конец}     - диапазон, границы включительно, любая может отсутствовать,
+                                        due_date сравнивается как дата 'YYYY-MM-DD';
+    "keywords": [слова]               - поиск по ключевым словам в title и description.
+Порядок задается sort_key - полем или списком полей, '-' перед полем - по убыванию,
+задачи без значения поля выдаются последними. Без sort_key задачи упорядочиваются
+по релевантности, если задан поиск по ключевым словам, иначе в порядке хранилища.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from .task import Task
+from .exceptions import InvalidInputData
+
+RANGE_BOUNDS = ("from", "to")
+
+
+@dataclass(frozen=True)
+class Condition:
+    """Условие на одно поле: op - 'eq', 'in', 'range' или 'keywords'."""
+
+    key: str
+    op: str
+    value: Any
+
+    def match(self, task: dict[str, Any]) -> bool:
+        value = task.get(self.key)
+        if self.op == "eq":
+            return value == self.value
+        if self.op == "in":
+            return value in self.value
+        if self.op == "range":
+            start, end = self.value
+            if self.key == "due_date":
+                # даты сравниваются порядковыми номерами дней, как в индексе сроков.
+                value = Task.encode_date(value)
+                start = None if start is None else Task.encode_date(start)
+                end = None if end is None else Task.encode_date(end)
+            return (
+                value is not None
+                and (start is None or value >= start)
+                and (end is None or value <= end)
+            )
+        raise InvalidInputData(f"Условие '{self.op}' проверяется только по индексу")
+
+
+def parse_filters(filters: dict[str, Any]) -> list[Condition]:
+    conditions = []
+    for key, value in filters.items():
+        if key == "keywords":
+            keywords = [value] if isinstance(value, str) else list(value)
+            conditions.append(Condition(key, "keywords", [word for word in keywords if word]))
+        elif isinstance(value, dict):
+            if not value or set(value) - set(RANGE_BOUNDS):
+                raise InvalidInputData(f"Диапазон поля '{key}' задается ключами 'from' и 'to'")
+            bounds = (value.get("from"), value.get("to"))
+            if key == "due_date" and any(
+                bound is not None and Task.encode_date(bound) is None for bound in bounds
+            ):
+                raise InvalidInputData(f"Невалидный диапазон дат {bounds[0]} - {bounds[1]}")
+            conditions.append(Condition(key, "range", bounds))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            conditions.append(Condition(key, "in", frozenset(value)))
+        else:
+            conditions.append(Condition(key, "eq", value))
+    return conditions
+
+
+def parse_sort(sort_key: str | list[str] | None) -> list[tuple[str, bool]]:
+    """Поля сортировки в виде (поле, по убыванию)."""
+
+    if sort_key is None:
+        return []
+    keys = [sort_key] if isinstance(sort_key, str) else sort_key
+    return [(key.removeprefix("-"), key.startswith("-")) for key in keys]
+
+
+def sort_tasks(tasks: list[dict[str, Any]], sort_key: str | list[str] | None) -> None:
+    """Устойчивая сортировка на месте, при равенстве сохраняется исходный порядок."""
+
+    for key, reverse in reversed(parse_sort(sort_key)):
+        if reverse:
+            tasks.sort(
+                key=lambda task: (task.get(key) is not None, task.get(key) or ""), reverse=True
+            )
+        else:
+            tasks.sort(key=lambda task: (task.get(key) is None, task.get(key) or ""))
@@ -0,0 +1,96 @@
+"""
+Потоковое чтение файла хранилища. Файл отображается в память (mmap) и разбирается
+итеративным парсером массива json: задачи выдаются по одной, в памяти держится только
+текущее окно файла, поэтому память не зависит от размера хранилища, а чтение
+прекращается, как только потребителю достаточно задач.
+Бинарный формат msgpack потоком не читается: файл разбирается целиком.
+"""
+
+import os
+import re
+import json
+import mmap
+import codecs
+from typing import Any, Iterator
+
+from . import serializers
+from .task import Task
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(data: bytes | mmap.mmap, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Элементы массива json из data, разбираемые по мере чтения окнами по chunk_size байт."""
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = len(data)
+    offset = 0
+    buffer = ""
+    index = 0
+
+    def read_more() -> bool:
+        nonlocal offset, buffer, index
+        if offset >= size:
+            return False
+        # окно растет вместе с неразобранным остатком, чтобы длинный элемент
+        # не разбирался заново на каждом чтении.
+        stop = offset + max(chunk_size, len(buffer) - index)
+        chunk = data[offset:stop]
+        offset += len(chunk)
+        buffer = buffer[index:] + decoder.decode(chunk, final=offset >= size)
+        index = 0
+        return True
+
+    def next_char() -> str:
+        nonlocal index
+        while True:
+            index = WHITESPACE.match(buffer, index).end()
+            if index < len(buffer):
+                return buffer[index]
+            if not read_more():
+                raise ValueError("Неожиданный конец файла хранилища")
+
+    if next_char() != "[":
+        raise ValueError("Файл хранилища не является массивом json")
+    index += 1
+    if next_char() == "]":
+        return
+    while True:
+        next_char()
+        try:
+            value, end = _decoder.raw_decode(buffer, index)
+        except json.JSONDecodeError:
+            if read_more():
+                continue
+            raise
+        if end == len(buffer) and read_more():
+            # элемент мог быть обрезан границей окна.
+            continue
+        index = end
+        yield value
+        separator = next_char()
+        index += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Неожиданный символ {separator!r} в файле хранилища")
+
+
+def iter_tasks(filename: str) -> Iterator[Task]:
+    """Задачи файла хранилища по одной. Отсутствующий или пустой файл - пустое хранилище."""
+
+    try:
+        f = open(filename, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        if not os.fstat(f.fileno()).st_size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:CHUNK_SIZE].lstrip()[:1] != b"[":
+                yield from serializers.load_tasks(data[:])
+                return
+            for task in iter_json_array(data):
+                yield Task(task)
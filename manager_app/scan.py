@@ -0,0 +1,121 @@
+"""
+Параллельный поиск ключевых слов перебором задач. Тексты задач (title и description)
+кодируются в один блок разделяемой памяти: таблица смещений int64 и данные utf-8,
+поэтому процессам передаются только имя блока, границы части и шаблон, а не список задач.
+Пул процессов создается при первом поиске и переиспользуется до выхода, блок текстов
+хранилище держит, пока не изменятся задачи.
+Модуль не импортирует остальной пакет, чтобы запуск процессов оставался дешевым.
+"""
+
+import re
+import array
+import atexit
+import weakref
+import threading
+import multiprocessing
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any
+
+OFFSET_SIZE = array.array("q").itemsize
+
+
+def count_matches(regex: re.Pattern, title: str, description: str) -> int:
+    """Количество совпадений: максимум из совпадений в title и description."""
+
+    return max(len(regex.findall(title)), len(regex.findall(description)))
+
+
+def _scan_chunk(
+    name: str, count: int, start: int, stop: int, pattern: str
+) -> list[tuple[int, int]]:
+    """(позиция, совпадений) задач start..stop блока name, в которых есть совпадения."""
+
+    block = shared_memory.SharedMemory(name=name)
+    regex = re.compile(pattern)
+    header = (2 * count + 1) * OFFSET_SIZE
+    offsets = block.buf[:header].cast("q")
+    data = block.buf[header:]
+    try:
+        result = []
+        for idx in range(start, stop):
+            title = str(data[offsets[2 * idx] : offsets[2 * idx + 1]], "utf-8")
+            description = str(data[offsets[2 * idx + 1] : offsets[2 * idx + 2]], "utf-8")
+            if matches := count_matches(regex, title, description):
+                result.append((idx, matches))
+        return result
+    finally:
+        # представления буфера освобождаются до закрытия блока.
+        offsets.release()
+        data.release()
+        block.close()
+
+
+class SharedTexts:
+    """
+    Тексты задач в блоке разделяемой памяти. Блок создается один раз и переиспользуется
+    поисками, пока хранилище не изменится, освобождается close или сборщиком мусора.
+    """
+
+    def __init__(self, tasks: list[dict[str, Any]]) -> None:
+        encoded = [text.encode() for task in tasks for text in (task["title"], task["description"])]
+        offsets = array.array("q", accumulate(map(len, encoded), initial=0))
+        header = len(offsets) * OFFSET_SIZE
+        block = shared_memory.SharedMemory(create=True, size=max(header + offsets[-1], 1))
+        self._release = weakref.finalize(self, _release_block, block)
+        block.buf[:header] = offsets.tobytes()
+        block.buf[header : header + offsets[-1]] = b"".join(encoded)
+        self.name = block.name
+        self.count = len(tasks)
+
+    def close(self) -> None:
+        self._release()
+
+
+def _release_block(block: shared_memory.SharedMemory) -> None:
+    block.close()
+    block.unlink()
+
+
+# пулы процессов по количеству процессов, создаются при первом параллельном поиске.
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if (pool := _pools.get(workers)) is None:
+            if not _pools:
+                atexit.register(_shutdown_pools)
+            # spawn: процессы не наследуют потоки и блокировки родителя.
+            context = multiprocessing.get_context("spawn")
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return pool
+
+
+def _shutdown_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+def parallel_scan(
+    texts: SharedTexts, pattern: str, workers: int, chunks_per_worker: int = 4
+) -> list[tuple[int, int]]:
+    """
+    Возвращает (позиция, совпадений) задач с совпадениями шаблона, в порядке позиций.
+    Задачи делятся на workers * chunks_per_worker частей, части обрабатываются
+    общим пулом процессов.
+    """
+
+    chunk = -(-texts.count // (workers * chunks_per_worker)) or 1
+    bounds = [(start, min(start + chunk, texts.count)) for start in range(0, texts.count, chunk)]
+    executor = _pool(workers)
+    futures = [
+        executor.submit(_scan_chunk, texts.name, texts.count, start, stop, pattern)
+        for start, stop in bounds
+    ]
+    return [match for future in futures for match in future.result()]
@@ -0,0 +1,83 @@
+"""
+Сериализация хранилища задач. Используется самая быстрая из доступных библиотек:
+orjson, msgspec, иначе стандартный json. Форматы файла:
+    pretty - json с отступами для чтения человеком;
+    compact - json без отступов;
+    msgpack - бинарный формат (требует msgspec или msgpack).
+При чтении формат определяется по содержимому файла.
+"""
+
+import json
+from typing import Any
+
+from .task import Task
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMATS = ("pretty", "compact", "msgpack")
+DECODE_ERRORS = (ValueError,) if msgspec is None else (ValueError, msgspec.DecodeError)
+
+
+def _to_builtin(obj: Any) -> dict[str, Any]:
+    if isinstance(obj, Task):
+        return obj.to_dict()
+    raise TypeError(f"Объект типа {type(obj).__name__} не сериализуется")
+
+
+def dumps(data: Any, fmt: str = "pretty") -> bytes:
+    if fmt == "msgpack":
+        if msgspec is not None:
+            return msgspec.msgpack.encode(data, enc_hook=_to_builtin)
+        if msgpack is not None:
+            return msgpack.packb(data, default=_to_builtin)
+        raise ImportError("Для формата msgpack требуется установить msgspec или msgpack")
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат хранилища: '{fmt}'")
+    pretty = fmt == "pretty"
+    if orjson is not None:
+        return orjson.dumps(data, default=_to_builtin, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if msgspec is not None:
+        raw = msgspec.json.encode(data, enc_hook=_to_builtin)
+        return msgspec.json.format(raw, indent=2) if pretty else raw
+    if pretty:
+        text = json.dumps(data, ensure_ascii=False, indent=2, default=_to_builtin)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_to_builtin)
+    return text.encode("utf-8")
+
+
+def _is_json(raw: bytes) -> bool:
+    # пустые данные разбираются как json, чтобы ошибка была той же, что и для неверного json.
+    return raw.lstrip()[:1] in (b"[", b"{", b'"', b"")
+
+
+def loads(raw: bytes) -> Any:
+    if not _is_json(raw):
+        if msgspec is not None:
+            return msgspec.msgpack.decode(raw)
+        if msgpack is not None:
+            return msgpack.unpackb(raw)
+        raise ImportError("Для формата msgpack требуется установить msgspec или msgpack")
+    if orjson is not None:
+        return orjson.loads(raw)
+    if msgspec is not None:
+        return msgspec.json.decode(raw)
+    return json.loads(raw)
+
+
+def load_tasks(raw: bytes) -> list[Task]:
+    # в Task превращаются только элементы списка, вложенные объекты остаются словарями.
+    return [Task(task) for task in loads(raw)]
@@ -0,0 +1,278 @@
+"""
+Асинхронный сервис хранилища задач. Протокол - JSON строки по Unix или TCP сокету:
+    запрос: {"id": 1, "method": "search_task", "params": [["category", "Работа"]]}
+    ответ:  {"id": 1, "result": [...]} или {"id": 1, "error": {"type": "...", "message": "..."}}
+Клиент может отправлять запросы не дожидаясь ответов, запросы одного соединения
+обрабатываются по порядку. Чтение выполняется из кеша хранилища, изменения выстраиваются
+в очередь единственного писателя, который применяет накопившиеся изменения одной
+транзакцией в рабочем потоке, не блокируя цикл событий.
+Запуск:
+    python -m manager_app.server --address unix:/tmp/tasks.sock
+    python -m manager_app.server --address 127.0.0.1:8765
+"""
+
+import os
+import socket
+import asyncio
+import argparse
+from contextlib import contextmanager
+from typing import Any
+
+from . import serializers
+from .exceptions import InvalidCommand, InvalidInputData, DataDoesNotExists
+
+ERRORS = {exc.__name__: exc for exc in (InvalidCommand, InvalidInputData, DataDoesNotExists)}
+
+
+def parse_address(address: str) -> tuple[str, Any]:
+    """'unix:/path/to.sock' или 'host:port'."""
+
+    if address.startswith("unix:"):
+        return "unix", address.removeprefix("unix:")
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+class TaskServer:
+    """Обслуживает TaskStorage (или SQLiteTaskStorage) для множества клиентов."""
+
+    READ_METHODS = (
+        "show_tasks",
+        "search_task",
+        "iter_tasks",
+        "due_tasks",
+        "overdue_tasks",
+        "query",
+        "summary",
+    )
+    WRITE_METHODS = (
+        "add_task",
+        "edit_task",
+        "done_task",
+        "delete_task",
+        "add_many",
+        "update_many",
+        "delete_where",
+    )
+    MAX_BATCH = 1000
+
+    def __init__(self, storage) -> None:
+        self.storage = storage
+
+    def _call(self, method: str, params: list[Any]) -> Any:
+        result = getattr(self.storage, method)(*params)
+        if method == "iter_tasks":
+            return list(result)
+        if method == "add_task":
+            return params[0]["id"]
+        return result
+
+    def _apply(self, batch: list[tuple[str, list[Any], asyncio.Future]]) -> list[tuple[bool, Any]]:
+        """Применяет пачку изменений одной транзакцией, выполняется в рабочем потоке."""
+
+        results = []
+        try:
+            with self.storage.transaction():
+                for method, params, _ in batch:
+                    try:
+                        results.append((True, self._call(method, params)))
+                    except Exception as exc:
+                        results.append((False, exc))
+        except Exception as exc:
+            # сохранение не удалось: ни одно изменение пачки не подтверждается.
+            results = [(False, exc)] * len(batch)
+        return results
+
+    async def _writer_loop(self) -> None:
+        """Единственный писатель: изменения из очереди применяются пачками с одним сохранением."""
+
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty() and len(batch) < self.MAX_BATCH:
+                batch.append(self._queue.get_nowait())
+            # чтения ждут окончания пачки, чтобы не видеть хранилище в середине изменения.
+            async with self._storage_lock:
+                results = await asyncio.to_thread(self._apply, batch)
+            for (_, _, future), (ok, value) in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    async def _dispatch(self, line: bytes) -> dict[str, Any]:
+        request_id = None
+        try:
+            request = serializers.loads(line)
+            request_id = request.get("id")
+            method, params = request["method"], request.get("params", [])
+            if method in self.READ_METHODS:
+                async with self._storage_lock:
+                    result = self._call(method, params)
+            elif method in self.WRITE_METHODS:
+                future = asyncio.get_running_loop().create_future()
+                await self._queue.put((method, params, future))
+                result = await future
+            else:
+                raise InvalidCommand(f"Неизвестный метод: '{method}'")
+        except tuple(ERRORS.values()) as exc:
+            return {"id": request_id, "error": {"type": type(exc).__name__, "message": str(exc)}}
+        except (*serializers.DECODE_ERRORS, KeyError, TypeError, AttributeError) as exc:
+            return {"id": request_id, "error": {"type": "InvalidInputData", "message": str(exc)}}
+        except Exception as exc:
+            return {"id": request_id, "error": {"type": "RuntimeError", "message": str(exc)}}
+        return {"id": request_id, "result": result}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # запросы соединения обрабатываются по порядку: чтение видит предыдущие изменения клиента.
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                response = await self._dispatch(line)
+                writer.write(serializers.dumps(response, "compact") + b"\n")
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionResetError, BrokenPipeError):
+                pass
+
+    async def start(self, address: str) -> asyncio.AbstractServer:
+        self._queue = asyncio.Queue()
+        self._storage_lock = asyncio.Lock()
+        self._writer = asyncio.create_task(self._writer_loop())
+        kind, target = parse_address(address)
+        if kind == "unix":
+            return await asyncio.start_unix_server(self.handle_connection, target)
+        return await asyncio.start_server(self.handle_connection, *target)
+
+    async def serve_forever(self, address: str) -> None:
+        server = await self.start(address)
+        async with server:
+            await server.serve_forever()
+
+
+class TaskClient:
+    """
+    Блокирующий клиент TaskServer с интерфейсом хранилища,
+    позволяет TaskManager работать тонким клиентом сервиса.
+    """
+
+    def __init__(self, address: str | None = None) -> None:
+        self.address = address or os.environ.get("TASK_SERVER_ADDRESS", "127.0.0.1:8765")
+        self._request_id = 0
+
+    @property
+    def connection(self):
+        if hasattr(self, "_connection"):
+            return self._connection
+        kind, target = parse_address(self.address)
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.connect(target)
+        self._socket = sock
+        self._connection = sock.makefile("rwb")
+        return self._connection
+
+    def close(self) -> None:
+        if hasattr(self, "_connection"):
+            self._connection.close()
+            self._socket.close()
+            del self._connection, self._socket
+
+    def request(self, method: str, *params: Any) -> Any:
+        self._request_id += 1
+        request = {"id": self._request_id, "method": method, "params": list(params)}
+        self.connection.write(serializers.dumps(request, "compact") + b"\n")
+        self.connection.flush()
+        response = serializers.loads(self.connection.readline())
+        if error := response.get("error"):
+            raise ERRORS.get(error["type"], RuntimeError)(error["message"])
+        return response["result"]
+
+    @contextmanager
+    def transaction(self):
+        # сервер сам объединяет изменения в транзакции.
+        yield self
+
+    def flush(self) -> None:
+        # сохранением изменений управляет хранилище сервера.
+        pass
+
+    def add_task(self, new_data: dict[str]) -> None:
+        new_data["id"] = self.request("add_task", new_data)
+
+    def show_tasks(self) -> list[dict[str, Any]]:
+        return self.request("show_tasks")
+
+    def iter_tasks(self, offset: int = 0, limit: int | None = None, sort_key: str | None = None):
+        return iter(self.request("iter_tasks", offset, limit, sort_key))
+
+    def search_task(self, search_data: tuple[str, Any], max_return=None) -> list[dict[str, Any]]:
+        return self.request("search_task", search_data, max_return)
+
+    def due_tasks(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        max_return: int | None = None,
+        status: str | None = None,
+    ) -> list[dict[str, Any]]:
+        return self.request("due_tasks", start, end, max_return, status)
+
+    def overdue_tasks(
+        self, today: str | None = None, max_return: int | None = None
+    ) -> list[dict[str, Any]]:
+        return self.request("overdue_tasks", today, max_return)
+
+    def query(
+        self,
+        filters: dict[str, Any],
+        sort_key: str | list[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        return self.request("query", filters, sort_key, offset, limit)
+
+    def summary(self, today: str | None = None) -> dict[str, Any]:
+        return self.request("summary", today)
+
+    def delete_task(self, delete_data: tuple[str, Any]) -> None:
+        self.request("delete_task", delete_data)
+
+    def edit_task(self, new_data: tuple[int, str, Any]) -> None:
+        self.request("edit_task", new_data)
+
+    def done_task(self, task_id: int) -> None:
+        self.request("done_task", task_id)
+
+    def add_many(self, new_tasks: list[dict[str]]) -> list[int]:
+        return self.request("add_many", list(new_tasks))
+
+    def update_many(self, task_ids: list[int], changes: dict[str, Any]) -> int:
+        return self.request("update_many", list(task_ids), changes)
+
+    def delete_where(self, filters: dict[str, Any]) -> int:
+        return self.request("delete_where", filters)
+
+
+if __name__ == "__main__":
+    from .manager import TaskManager
+
+    parser = argparse.ArgumentParser(description="Сервис хранилища задач.")
+    parser.add_argument("--address", default="127.0.0.1:8765")
+    engines = [engine for engine in TaskManager.STORAGE_ENGINES if engine != "server"]
+    parser.add_argument("--engine", choices=engines, default="json")
+    args = parser.parse_args()
+    storage = TaskManager.storage_class(args.engine)()
+    try:
+        asyncio.run(TaskServer(storage).serve_forever(args.address))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,247 @@
+import os
+import json
+import heapq
+import hashlib
+from typing import Any
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+
+from . import serializers
+from .task import Task
+from .locking import atomic_write
+from .metrics import metrics
+from .storage import TaskStorage, mutation
+from .exceptions import DataDoesNotExists
+
+PARTITIONS = ("category", "hash")
+# ключ шарда задач без категории: символ, который нельзя ввести в названии категории.
+NO_CATEGORY_KEY = "\x00"
+
+
+class ShardedTaskStorage(TaskStorage):
+    """
+    Хранилище задач, разделенное на файлы-шарды: по категории (_partition = 'category')
+    или по остатку от деления id на _shard_count (_partition = 'hash').
+    Состав хранилища описывает манифест (tasks.json.manifest): для каждого шарда - файл,
+    количество задач и максимальный id. Мутация записывает затронутые шарды в новые файлы
+    и затем атомарно заменяет манифест, поэтому изменение нескольких шардов (например, смена
+    категории задачи) применяется целиком, а остальные шарды не перезаписываются.
+    Шарды загружаются пулом потоков. Пока хранилище не загружено, поиск и удаление
+    по категории читают и изменяют только шард этой категории.
+    Если манифеста нет, задачи читаются из обычного файла хранилища (tasks.json) и при первой
+    мутации разбиваются на шарды, сам файл остается без изменений.
+    Способ разбиения существующего хранилища берется из манифеста.
+    """
+
+    _partition = os.environ.get("TASK_STORAGE_PARTITION", "category")
+    _shard_count = 16
+    _load_workers = 8
+    _streaming_reads = False
+
+    def __init__(self) -> None:
+        if self._partition not in PARTITIONS:
+            raise ValueError(f"Неизвестный способ разбиения хранилища: '{self._partition}'")
+        super().__init__()
+
+    @property
+    def _manifest_filename(self) -> str:
+        return f"{self._filename}.manifest"
+
+    def _shard_path(self, filename: str) -> str:
+        return os.path.join(os.path.dirname(self._filename), filename)
+
+    def _file_signature(self) -> tuple[int, ...] | None:
+        try:
+            stat = os.stat(self._manifest_filename)
+        except FileNotFoundError:
+            # хранилище еще не разбито на шарды.
+            return super()._file_signature()
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read_manifest(self) -> dict[str, Any] | None:
+        try:
+            with open(self._manifest_filename, "rb") as f:
+                return json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_manifest(self, manifest: dict[str, Any]) -> None:
+        raw = json.dumps(manifest, ensure_ascii=False).encode()
+        atomic_write(self._manifest_filename, raw, self._fsync)
+        self._manifest = manifest
+
+    def _new_manifest(self) -> dict[str, Any]:
+        return {
+            "partition": self._partition,
+            "shard_count": self._shard_count,
+            "generation": 0,
+            "shards": {},
+        }
+
+    @staticmethod
+    def _category_key(category: str | None) -> str:
+        return NO_CATEGORY_KEY if category is None else category
+
+    def _shard_key(self, task: dict[str, Any]) -> str:
+        if self._manifest["partition"] == "category":
+            return self._category_key(task["category"])
+        return str(task["id"] % self._manifest["shard_count"])
+
+    def _load(self) -> list[Task] | list:
+        manifest = self._read_manifest()
+        self._resharding = manifest is None
+        if manifest is None:
+            self._manifest = self._new_manifest()
+            return super()._load()
+        while True:
+            try:
+                storage_data = self._load_shards(manifest)
+            except FileNotFoundError:
+                # файлы шардов удалил писатель, заменивший манифест во время чтения.
+                current = self._read_manifest()
+                if current == manifest:
+                    raise
+                manifest = current
+                continue
+            self._manifest = manifest
+            return storage_data
+
+    def _load_shards(self, manifest: dict[str, Any]) -> list[Task]:
+        """Читает шарды параллельно и объединяет их в порядке id."""
+
+        files = [shard["file"] for shard in manifest["shards"].values()]
+        if not files:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self._load_workers, len(files))) as executor:
+            shards = list(executor.map(self._read_shard, files))
+        return list(heapq.merge(*shards, key=attrgetter("id")))
+
+    def _read_shard(self, filename: str) -> list[Task]:
+        with open(self._shard_path(filename), "rb") as f:
+            raw = f.read()
+        metrics.incr("storage.bytes_read", len(raw))
+        return serializers.load_tasks(raw)
+
+    def _build_indexes(self, storage_data: list[Task]) -> None:
+        super()._build_indexes(storage_data)
+        self._shards: dict[str, dict[int, Task]] = {}
+        self._shard_of: dict[int, str] = {}
+        for task in storage_data:
+            key = self._shard_of[task.id] = self._shard_key(task)
+            self._shards.setdefault(key, {})[task.id] = task
+
+    def _write_shards(self, keys: set[str]) -> None:
+        """Записывает шарды keys в файлы нового поколения и заменяет манифест."""
+
+        manifest = self._manifest
+        generation = manifest["generation"] + 1
+        shards = dict(manifest["shards"])
+        obsolete = [shards.pop(key)["file"] for key in keys if key in shards]
+        with metrics.timer("storage.dump"):
+            for key in keys:
+                if not (shard := self._shards.get(key)):
+                    self._shards.pop(key, None)
+                    continue
+                tasks = sorted(shard.values(), key=lambda task: task["id"])
+                digest = hashlib.md5(key.encode()).hexdigest()[:12]
+                filename = f"{os.path.basename(self._filename)}.{digest}.{generation}"
+                raw = serializers.dumps(tasks, self._format)
+                atomic_write(self._shard_path(filename), raw, self._fsync)
+                metrics.incr("storage.bytes_written", len(raw))
+                shards[key] = {"file": filename, "count": len(tasks), "max_id": tasks[-1]["id"]}
+            self._write_manifest({**manifest, "generation": generation, "shards": shards})
+        self._remove_shards(obsolete)
+
+    def _remove_shards(self, files: list[str]) -> None:
+        for filename in files:
+            try:
+                os.remove(self._shard_path(filename))
+            except FileNotFoundError:
+                pass
+
+    def refresh(self, storage_data: list[dict[str]]) -> None:
+        """Перезаписывает все шарды по storage_data."""
+
+        manifest = self._read_manifest() or self._new_manifest()
+        self._manifest = {**manifest, "shards": {}}
+        shards = self._shards = {}
+        for task in storage_data:
+            shards.setdefault(self._shard_key(task), {})[task["id"]] = task
+        self._write_shards(set(shards))
+        self._remove_shards([shard["file"] for shard in manifest["shards"].values()])
+        self._resharding = False
+
+    def _persist(self, storage_data: list[Task], changes: list[tuple[str, Any]]) -> None:
+        """Перезаписывает только шарды, затронутые изменениями."""
+
+        affected = set()
+        for op, payload in changes:
+            if op == "put":
+                key = self._shard_key(payload)
+                previous = self._shard_of.get(payload["id"])
+                if previous is not None and previous != key:
+                    del self._shards[previous][payload["id"]]
+                    affected.add(previous)
+                self._shards.setdefault(key, {})[payload["id"]] = payload
+                self._shard_of[payload["id"]] = key
+                affected.add(key)
+            else:
+                for task_id in payload:
+                    if (key := self._shard_of.pop(task_id, None)) is not None:
+                        del self._shards[key][task_id]
+                        affected.add(key)
+        if self._resharding:
+            self.refresh(storage_data)
+        else:
+            self._write_shards(affected)
+        self._signature = self._file_signature()
+
+    def _search(self, search_data: tuple[str, Any], max_return=None) -> list[Task]:
+        key, value = search_data
+        if key == "category" and not hasattr(self, "_cache"):
+            manifest = self._read_manifest()
+            if manifest is not None and manifest["partition"] == "category":
+                shard = manifest["shards"].get(self._category_key(value))
+                try:
+                    tasks = self._read_shard(shard["file"]) if shard is not None else []
+                except FileNotFoundError:
+                    pass
+                else:
+                    return tasks[:max_return]
+        return super()._search(search_data, max_return)
+
+    @mutation
+    def delete_task(self, delete_data: tuple[str, str]) -> None:
+        """Удаление по категории в незагруженном хранилище удаляет шард категории целиком."""
+
+        if not self._drop_shard(delete_data):
+            super().delete_task(delete_data)
+
+    def _drop_shard(self, delete_data: tuple[str, str]) -> bool:
+        key, value = delete_data
+        if (
+            key != "category"
+            or hasattr(self, "_cache")
+            or self._pending_changes is not None
+            or self._commit_delay
+            or (count := self._meta_value("count")) is None
+        ):
+            return False
+        manifest = self._read_manifest()
+        if manifest is None or manifest["partition"] != "category":
+            return False
+        with metrics.timer("storage.delete_task"):
+            shards = dict(manifest["shards"])
+            if (shard := shards.pop(self._category_key(value), None)) is None:
+                raise DataDoesNotExists(f"Задачи с такими данными: {delete_data} не найдена")
+            # сводные счетчики уменьшаются на задачи удаляемого шарда.
+            if (aggregates := self._stored_aggregates()) is not None:
+                for task in self._read_shard(shard["file"]):
+                    aggregates.remove(task)
+            self._write_manifest(
+                {**manifest, "generation": manifest["generation"] + 1, "shards": shards}
+            )
+            self._remove_shards([shard["file"]])
+            self._version += 1
+            self._write_header(self._last_id, count - shard["count"], aggregates)
+        return True
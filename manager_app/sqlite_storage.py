@@ -0,0 +1,416 @@
+import re
+import sqlite3
+import datetime as dt
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+from .metrics import timed
+from .query import parse_filters, parse_sort, sort_tasks
+from .indexes import TOKEN_PATTERN, Aggregates, InvertedIndex
+from .exceptions import DataDoesNotExists, InvalidInputData
+
+
+class SQLiteTaskStorage:
+    """
+    Хранилище задач в базе SQLite с тем же интерфейсом, что и TaskStorage.
+    Поля id/category/status/priority/due_date проиндексированы, поиск по ключевым
+    словам выполняется через FTS5. База работает в режиме WAL. Запросы используют
+    постоянный текст с параметрами, поэтому подготовленные выражения
+    переиспользуются из кеша соединения sqlite3.
+    """
+
+    _filename = "tasks.db"
+    _in_transaction = False
+    COLUMNS = ("id", "title", "description", "category", "due_date", "priority", "status")
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            category TEXT,
+            due_date TEXT,
+            priority TEXT,
+            status TEXT
+        );
+        CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category);
+        CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+        CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+        CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5 (
+            title, description, content='tasks', content_rowid='id'
+        );
+        CREATE TRIGGER IF NOT EXISTS tasks_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_au AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END;
+    """
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if hasattr(self, "_connection"):
+            return self._connection
+        self._connection = sqlite3.connect(self._filename)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self.SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        if hasattr(self, "_connection"):
+            self._connection.close()
+            delattr(self, "_connection")
+
+    def flush(self) -> None:
+        # каждое изменение фиксируется транзакцией базы, отложенных изменений нет.
+        pass
+
+    @contextmanager
+    def transaction(self):
+        """Группирует мутации в одну транзакцию базы, вложенные присоединяются к внешней."""
+
+        if self._in_transaction:
+            yield self
+            return
+        self._in_transaction = True
+        try:
+            with self.connection:
+                yield self
+        finally:
+            self._in_transaction = False
+
+    def _write(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        """Выполняет изменяющий запрос, фиксируя его, если нет внешней транзакции."""
+
+        if self._in_transaction:
+            return self.connection.execute(sql, parameters)
+        with self.connection as connection:
+            return connection.execute(sql, parameters)
+
+    def _check_key(self, key: str) -> None:
+        if key not in self.COLUMNS:
+            raise InvalidInputData(f"Неизвестное поле задачи: '{key}'")
+
+    @timed
+    def add_task(self, new_data: dict[str]) -> None:
+        """Добавляет задачу"""
+
+        self._add(new_data)
+
+    def _add(self, new_data: dict[str]) -> None:
+        cursor = self._write(
+            "INSERT INTO tasks (title, description, category, due_date, priority, status) "
+            "VALUES (:title, :description, :category, :due_date, :priority, :status)",
+            new_data,
+        )
+        new_data["id"] = cursor.lastrowid
+
+    @timed
+    def show_tasks(self) -> list[dict[str, Any]]:
+        return [dict(row) for row in self.connection.execute("SELECT * FROM tasks ORDER BY id")]
+
+    @timed
+    def iter_tasks(
+        self, offset: int = 0, limit: int | None = None, sort_key: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Постраничный обход задач курсором базы."""
+
+        sort_key = sort_key or "id"
+        self._check_key(sort_key)
+        rows = self.connection.execute(
+            f"SELECT * FROM tasks ORDER BY {sort_key}, id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset),
+        )
+        for row in rows:
+            yield dict(row)
+
+    def _keywords_search(self, keywords: list[str]) -> list[dict[str, Any]]:
+        """
+        Поиск по ключевым словам с тем же ранжированием, что и у TaskStorage:
+        по максимуму совпадений в title и description, при равенстве - более поздние задачи.
+        FTS5 отбирает кандидатов (без учета регистра), точный подсчет совпадений
+        выполняется только по кандидатам.
+        """
+
+        keywords = set(keyword for keyword in keywords if keyword)
+        if all(TOKEN_PATTERN.fullmatch(keyword) for keyword in keywords):
+            if not keywords:
+                return []
+            query = " OR ".join('"{}"'.format(keyword.replace('"', '""')) for keyword in keywords)
+            rows = self.connection.execute(
+                "SELECT tasks.* FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid "
+                "WHERE tasks_fts MATCH ?",
+                (query,),
+            )
+
+            def count_matches(text: str) -> int:
+                tokens = InvertedIndex.tokenize(text)
+                return sum(tokens[keyword] for keyword in keywords)
+
+        else:
+            rows = self.connection.execute("SELECT * FROM tasks")
+            pattern = re.compile(rf"\b({'|'.join(map(re.escape, keywords))})\b")
+
+            def count_matches(text: str) -> int:
+                return len(pattern.findall(text))
+
+        count_match_with_task = []
+        for row in rows:
+            count = max(count_matches(row["title"]), count_matches(row["description"]))
+            if count:
+                count_match_with_task.append((count, row["id"], dict(row)))
+        count_match_with_task.sort(key=lambda match: (match[0], match[1]), reverse=True)
+        return [task for _, _, task in count_match_with_task]
+
+    @timed
+    def search_task(self, search_data: tuple[str, Any], max_return=None) -> list[dict[str, Any]]:
+        """
+        Поиск задач по ключам.
+        Поиск по категориям, по ключевым словам, по статусу.
+        В рамках интерфейса, возможен поиск по любому полю задачи.
+        """
+
+        key, value = search_data
+        if key == "keywords":
+            return self._keywords_search(value)
+        if key not in self.COLUMNS:
+            return []
+        rows = self.connection.execute(
+            f"SELECT * FROM tasks WHERE {key} = ? ORDER BY id LIMIT ?",
+            (value, -1 if max_return is None else max_return),
+        )
+        return [dict(row) for row in rows]
+
+    @timed
+    def due_tasks(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        max_return: int | None = None,
+        status: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Задачи со сроком от start до end включительно по индексу tasks_due_date."""
+
+        return self._due_tasks(start, end, max_return, status)
+
+    def _due_tasks(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        max_return: int | None = None,
+        status: str | None = None,
+    ) -> list[dict[str, Any]]:
+        # даты 'YYYY-MM-DD' упорядочиваются как строки, прочие значения не учитываются.
+        sql = "SELECT * FROM tasks WHERE due_date GLOB ?"
+        parameters = ["[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"]
+        for condition, value in (
+            ("due_date >= ?", start),
+            ("due_date <= ?", end),
+            ("status = ?", status),
+        ):
+            if value is not None:
+                sql += f" AND {condition}"
+                parameters.append(value)
+        rows = self.connection.execute(
+            f"{sql} ORDER BY due_date, id LIMIT ?",
+            (*parameters, -1 if max_return is None else max_return),
+        )
+        return [dict(row) for row in rows]
+
+    @timed
+    def overdue_tasks(
+        self, today: str | None = None, max_return: int | None = None
+    ) -> list[dict[str, Any]]:
+        today = dt.date.fromisoformat(today) if today is not None else dt.date.today()
+        yesterday = (today - dt.timedelta(days=1)).isoformat()
+        return self._due_tasks(end=yesterday, max_return=max_return, status="Не выполнена")
+
+    @timed
+    def summary(self, today: str | None = None) -> dict[str, Any]:
+        """Сводка как у TaskStorage, счетчики считаются группировкой в SQL."""
+
+        today = dt.date.fromisoformat(today) if today is not None else dt.date.today()
+        aggregates = Aggregates()
+        rows = self.connection.execute(
+            "SELECT category, status, priority, COUNT(*) FROM tasks "
+            "GROUP BY category, status, priority"
+        )
+        for category, status, priority, count in rows:
+            aggregates.counts[(category, status, priority)] = count
+        rows = self.connection.execute(
+            "SELECT category, due_date, COUNT(*) FROM tasks "
+            "WHERE due_date GLOB ? AND status IS NOT ? GROUP BY category, due_date",
+            ("[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]", Aggregates.DONE),
+        )
+        for category, due_date, count in rows:
+            try:
+                ordinal = dt.date.fromisoformat(due_date).toordinal()
+            except ValueError:
+                continue
+            aggregates.open_due[(category, ordinal)] = count
+        return aggregates.summary(today.toordinal())
+
+    @timed
+    def query(
+        self,
+        filters: dict[str, Any],
+        sort_key: str | list[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Составной запрос с тем же результатом, что и у TaskStorage. Условия и сортировка
+        переводятся в один запрос SQL, выбор индекса выполняет планировщик SQLite.
+        При поиске по ключевым словам условия проверяются по ранжированным кандидатам FTS.
+        """
+
+        conditions = parse_filters(filters)
+        sort_keys = parse_sort(sort_key)
+        for key in [condition.key for condition in conditions] + [key for key, _ in sort_keys]:
+            if key != "keywords":
+                self._check_key(key)
+        stop = None if limit is None else offset + limit
+        if any(condition.op == "keywords" for condition in conditions):
+            keywords = next(condition for condition in conditions if condition.op == "keywords")
+            tasks = [
+                task
+                for task in self._keywords_search(keywords.value)
+                if all(
+                    condition.match(task) for condition in conditions if condition is not keywords
+                )
+            ]
+            if sort_key is not None:
+                sort_tasks(tasks, sort_key)
+            return tasks[offset:stop]
+        where, parameters = [], []
+        for condition in conditions:
+            if condition.op == "eq":
+                where.append(f"{condition.key} = ?")
+                parameters.append(condition.value)
+            elif condition.op == "in":
+                where.append(f"{condition.key} IN ({', '.join('?' * len(condition.value))})")
+                parameters.extend(condition.value)
+            else:
+                for operator, bound in zip((">=", "<="), condition.value):
+                    if bound is not None:
+                        where.append(f"{condition.key} {operator} ?")
+                        parameters.append(bound)
+                where.append(f"{condition.key} IS NOT NULL")
+        # задачи без значения поля выдаются последними, как и в TaskStorage.
+        order = [f"{key} IS NULL, {key}{' DESC' if reverse else ''}" for key, reverse in sort_keys]
+        rows = self.connection.execute(
+            f"SELECT * FROM tasks {'WHERE ' + ' AND '.join(where) if where else ''} "
+            f"ORDER BY {', '.join([*order, 'id'])} LIMIT ? OFFSET ?",
+            (*parameters, -1 if limit is None else limit, offset),
+        )
+        return [dict(row) for row in rows]
+
+    @timed
+    def delete_task(self, delete_data: tuple[str, Any]) -> None:
+        """
+        Удаление задачи по ключам. По id или по категории.
+        В рамках интерфейса, возможно удаление по любому полю задачи.
+        """
+
+        key, value = delete_data
+        if key not in self.COLUMNS:
+            raise DataDoesNotExists(f"Задачи с такими данными: {delete_data} не найдена")
+        cursor = self._write(f"DELETE FROM tasks WHERE {key} = ?", (value,))
+        if not cursor.rowcount:
+            raise DataDoesNotExists(f"Задачи с такими данными: {delete_data} не найдена")
+
+    @timed
+    def edit_task(self, new_data: tuple[int, str, Any]) -> None:
+        """Редактирование задачи."""
+
+        self._edit(new_data)
+
+    def _edit(self, new_data: tuple[int, str, Any]) -> None:
+        task_id, change_key, new_value = new_data
+        self._check_key(change_key)
+        cursor = self._write(
+            f"UPDATE tasks SET {change_key} = ? WHERE id = ?", (new_value, task_id)
+        )
+        if not cursor.rowcount:
+            raise DataDoesNotExists(f"Задачи с id {task_id} не найдена")
+
+    @timed
+    def done_task(self, task_id: int) -> None:
+        """Завершение задачи (установка статуса 'выполнена')."""
+
+        self._edit((task_id, "status", "Выполнена"))
+
+    @timed
+    def add_many(self, new_tasks: Iterable[dict[str]]) -> list[int]:
+        """Добавляет задачи одной транзакцией."""
+
+        new_tasks = list(new_tasks)
+        with self.transaction():
+            for task in new_tasks:
+                self._add(task)
+        return [task["id"] for task in new_tasks]
+
+    @timed
+    def update_many(
+        self,
+        predicate_or_ids: Callable[[dict[str]], bool] | Iterable[int],
+        changes: dict[str, Any],
+    ) -> int:
+        """
+        Изменяет поля changes у задач, выбранных предикатом или списком id.
+        Возвращает количество измененных задач.
+        """
+
+        for key in changes:
+            self._check_key(key)
+        if callable(predicate_or_ids):
+            rows = self.connection.execute("SELECT * FROM tasks ORDER BY id")
+            task_ids = [row["id"] for row in rows if predicate_or_ids(dict(row))]
+        else:
+            task_ids = list(dict.fromkeys(predicate_or_ids))
+        assignments = ", ".join(f"{key} = :{key}" for key in changes)
+        updated = 0
+        with self.transaction():
+            for task_id in task_ids:
+                updated += self._write(
+                    f"UPDATE tasks SET {assignments} WHERE id = :task_id",
+                    {**changes, "task_id": task_id},
+                ).rowcount
+        return updated
+
+    @timed
+    def delete_where(self, filters: dict[str, Any]) -> int:
+        """Удаляет задачи, у которых все поля filters равны указанным значениям."""
+
+        if not filters:
+            raise InvalidInputData("Не указаны условия удаления задач")
+        for key in filters:
+            self._check_key(key)
+        conditions = " AND ".join(f"{key} = :{key}" for key in filters)
+        return self._write(f"DELETE FROM tasks WHERE {conditions}", filters).rowcount
+
+    @timed
+    def import_tasks(self, tasks: Iterable[dict[str, Any]]) -> int:
+        """Загружает задачи с сохранением их id одной транзакцией."""
+
+        with self.connection as connection:
+            cursor = connection.executemany(
+                "INSERT INTO tasks (id, title, description, category, due_date, priority, status) "
+                "VALUES (:id, :title, :description, :category, :due_date, :priority, :status) "
+                "ON CONFLICT (id) DO UPDATE SET title = excluded.title, "
+                "description = excluded.description, category = excluded.category, "
+                "due_date = excluded.due_date, priority = excluded.priority, "
+                "status = excluded.status",
+                tasks,
+            )
+        return cursor.rowcount
@@ -1,64 +1,621 @@
+import os
 import re
 import json
-from typing import Any
+import heapq
+import atexit
+import weakref
+import functools
+import datetime as dt
+import threading
+from itertools import islice
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterable, Iterator
 
-from .exceptions import DataDoesNotExists
+from . import reader, serializers
+from .task import Task
+from .locking import atomic_write, file_lock
+from .metrics import metrics, timed
+from .query import Condition, parse_filters, sort_tasks
+from .indexes import TOKEN_PATTERN, Aggregates, DueDateIndex, HashIndex, InvertedIndex
+from .exceptions import DataDoesNotExists, InvalidInputData
+
+# хранилища в режиме группового коммита: отложенные изменения сохраняются при выходе.
+# Ссылки слабые, чтобы регистрация не удерживала хранилища до завершения процесса.
+_group_commit_storages: "weakref.WeakSet[TaskStorage]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_group_commits() -> None:
+    for storage in list(_group_commit_storages):
+        storage.flush()
+
+
+def mutation(method: Callable) -> Callable:
+    """Выполняет мутацию хранилища под блокировкой записи на актуальных данных."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock():
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class TaskStorage:
     """
-    Класс для управления хранилищем задач. Данные содержатся в json формате.
+    Класс для управления хранилищем задач. Данные содержатся в json формате
+    (_format: 'pretty' или 'compact') либо в бинарном msgpack.
     Для уменьшения нагрузки на файловый дескриптор, данные кешируются.
+    В режиме сквозной записи (_write_through) мутации обновляют кеш и сохраняют его
+    без сброса, кеш перечитывается только если файл изменил другой процесс.
+    Вместе с кешем поддерживаются индексы: первичный по id, вторичные по _indexed_fields
+    и полнотекстовый для поиска по ключевым словам. Полнотекстовый индекс строится
+    при первом поиске по ключевым словам, может сохраняться рядом с хранилищем
+    (_persist_text_index), чтобы не строить его после старта, или не строиться вовсе
+    (_full_text_index = False), тогда ключевые слова ищутся перебором.
+    Перебор хранилища от _parallel_scan_threshold задач выполняется параллельно
+    в _scan_workers процессах (manager_app.scan).
+    Пока хранилище не загружено, постраничный обход и поиск с ограничением количества
+    читают файл потоком (_streaming_reads, manager_app.reader) и не загружают его целиком.
+    Сводные счетчики (Aggregates) обновляются вместе с индексами и сохраняются рядом
+    с хранилищем (tasks.json.stats), поэтому сводка (summary) доступна без загрузки хранилища.
+    Мутации выполняются под межпроцессной блокировкой: если версия хранилища в файле
+    метаданных отличается от версии кеша, кеш перечитывается и изменение применяется
+    к свежим данным. Последний выданный id хранится в метаданных счетчиком, который
+    читается под блокировкой и только растет, поэтому id не повторяются между процессами
+    и после удаления задач.
+    Надежность сохранения задается _durability (TASK_STORAGE_DURABILITY):
+        fsync - каждое изменение записывается и сбрасывается на диск (fsync);
+        commit - каждое изменение записывается в файл (по умолчанию);
+        <N>ms - групповой коммит: изменения копятся в памяти и записываются одним
+                сохранением не позднее чем через N мс или по накоплении _commit_batch_size
+                изменений. До сохранения блокировка записи удерживается процессом,
+                flush сохраняет изменения сразу, при завершении процесса они сохраняются автоматически.
     """
 
     _filename = "tasks.json"
+    _format = os.environ.get("TASK_STORAGE_FORMAT", "pretty")
+    _write_through = True
+    _indexed_fields = ("category", "status", "priority", "due_date")
+    _persist_text_index = False
+    _full_text_index = True
+    _parallel_scan_threshold = 500_000
+    _scan_workers = os.cpu_count() or 1
+    _fsync = False
+    _durability = os.environ.get("TASK_STORAGE_DURABILITY", "commit")
+    _commit_batch_size = 1000
+    # изменения сохраняются дописыванием (журнал): добавление задачи не требует загрузки.
+    _append_only = False
+    # файл хранилища - полный массив задач, который можно читать потоком.
+    _streaming_reads = True
 
     def __init__(self) -> None:
-        self._last_id = self._get_last_id()
+        self._pending_changes = None
+        self._scan_texts = None
+        self._lock_depth = 0
+        self._mutex = threading.RLock()
+        self._held_lock = None
+        self._deferred_changes = []
+        self._flush_timer = None
+        self._configure_durability()
+        self._last_id = self._read_last_id(self._read_meta())
+
+    def _configure_durability(self) -> None:
+        self._commit_delay = 0.0
+        if self._durability == "fsync":
+            self._fsync = True
+        elif match := re.fullmatch(r"([0-9]+)ms", self._durability):
+            self._commit_delay = int(match[1]) / 1000
+            _group_commit_storages.add(self)
+        elif self._durability != "commit":
+            raise ValueError(f"Неизвестный уровень надежности хранилища: '{self._durability}'")
 
     @property
     def cache(self):
-        if hasattr(self, "_cache"):
+        if hasattr(self, "_cache") and self._signature == self._file_signature():
             return self._cache
+        # сигнатура и версия снимаются до чтения: изменение во время загрузки
+        # приведет к перечитыванию.
+        self._signature = self._file_signature()
+        self._version = self._read_meta().get("version", 0)
+        with metrics.timer("storage.load"):
+            try:
+                storage_data = self._load()
+            except FileNotFoundError:
+                storage_data = []
+            self._cache = storage_data
+            self._build_indexes(storage_data)
+        return self._cache
+
+    def _count_cache_access(self, streaming: bool = False) -> None:
+        """
+        Учитывает в метриках обращение публичной операции чтения: попадание, если кеш
+        загружен и актуален, иначе промах. Операции, которые без загруженного кеша
+        читают файл потоком (streaming), учитываются отдельным счетчиком, так как
+        кеш не загружают. Внутренние обращения к cache не учитываются.
+        """
+
+        if hasattr(self, "_cache") and self._signature == self._file_signature():
+            metrics.incr("storage.cache_hits")
+        elif streaming and self._streaming_reads and not hasattr(self, "_cache"):
+            metrics.incr("storage.streamed_reads")
+        else:
+            metrics.incr("storage.cache_misses")
+
+    @property
+    def _text_index_filename(self) -> str:
+        return f"{self._filename}.idx"
+
+    def _build_indexes(self, storage_data: list[Task]) -> None:
+        self._drop_scan_texts()
+        self._id_index = {task.id: task for task in storage_data}
+        self._indexes = {key: HashIndex(key) for key in self._indexed_fields}
+        # полнотекстовый индекс строится при первом поиске по ключевым словам.
+        self._text_index = self._load_text_index()
+        self._text_index_signature = self._signature if self._text_index is not None else None
+        self._due_index = DueDateIndex()
+        self._aggregates = Aggregates()
+        for index in (*self._indexes.values(), self._due_index, self._aggregates):
+            index.add_many(storage_data)
+
+    def _keyword_index(self) -> InvertedIndex | None:
+        """Полнотекстовый индекс загруженного кеша, при первом обращении строится по кешу."""
+
+        if self._text_index is None and self._full_text_index:
+            self._text_index = InvertedIndex()
+            for task in self._cache:
+                self._text_index.add(task)
+        return self._text_index
+
+    def _load_text_index(self) -> InvertedIndex | None:
+        """Загружает сохраненный полнотекстовый индекс, если он соответствует версии файла."""
+
+        if not (self._persist_text_index and self._full_text_index):
+            return None
         try:
-            self._cache = self._load()
-            return self._cache
+            with open(self._text_index_filename, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data["signature"] != list(self._signature or ()):
+            return None
+        return InvertedIndex.from_dump(data["postings"])
+
+    def _save_text_index(self) -> None:
+        """
+        Сохраняет полнотекстовый индекс актуального кеша. Индекс записывается целиком,
+        поэтому сохраняется не при каждой мутации, а при сжатии, flush и close,
+        и только если файл хранилища изменился с прошлого сохранения.
+        """
+
+        if not (self._persist_text_index and self._full_text_index):
+            return
+        if not hasattr(self, "_cache") or self._signature != self._file_signature():
+            return
+        if self._text_index_signature == self._signature:
+            return
+        postings = self._keyword_index().dump()
+        data = {"signature": list(self._signature or ()), "postings": postings}
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        atomic_write(self._text_index_filename, raw, self._fsync)
+        self._text_index_signature = self._signature
+
+    def _secondary_indexes(self) -> list:
+        indexes = [*self._indexes.values(), self._due_index, self._aggregates]
+        if self._text_index is not None:
+            indexes.append(self._text_index)
+        return indexes
+
+    def _index_add(self, task: dict[str], keys: Iterable[str] | None = None) -> None:
+        """Добавляет задачу в индексы. При указании keys обновляются только индексы этих полей."""
+
+        self._id_index[task.id] = task
+        if keys is None or "title" in keys or "description" in keys:
+            self._drop_scan_texts()
+        for index in self._secondary_indexes():
+            if keys is None or any(key in index.fields for key in keys):
+                index.add(task)
+
+    def _index_remove(self, task: dict[str], keys: Iterable[str] | None = None) -> None:
+        del self._id_index[task.id]
+        if keys is None or "title" in keys or "description" in keys:
+            self._drop_scan_texts()
+        for index in self._secondary_indexes():
+            if keys is None or any(key in index.fields for key in keys):
+                index.remove(task)
+
+    def _get_by_id(self, task_id: int) -> dict[str]:
+        """Поиск задачи по первичному индексу, кеш должен быть загружен."""
+
+        if (task := self._id_index.get(task_id)) is not None:
+            return task
+        raise DataDoesNotExists(f"Задачи с id {task_id} не найдена")
+
+    def _file_signature(self) -> tuple[int, ...] | None:
+        """Идентификация версии файла по inode, времени изменения и размеру."""
+
+        try:
+            stat = os.stat(self._filename)
         except FileNotFoundError:
-            self.refresh([])
-            self._cache = self._load()
-            return self._cache
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
 
     def clean_cache(self):
         delattr(self, "_cache")
+        self._drop_scan_texts()
+
+    def _shared_texts(self, storage_data: list[Task]):
+        """
+        Тексты задач кеша в разделяемой памяти для параллельного перебора (manager_app.scan).
+        Блок кодируется при первом переборе и сбрасывается при изменении текстов задач
+        или перечитывании хранилища.
+        """
+
+        from .scan import SharedTexts
+
+        if self._scan_texts is None:
+            self._scan_texts = SharedTexts(storage_data)
+        return self._scan_texts
+
+    def _drop_scan_texts(self) -> None:
+        if self._scan_texts is not None:
+            self._scan_texts.close()
+            self._scan_texts = None
+
+    @property
+    def _meta_filename(self) -> str:
+        return f"{self._filename}.meta"
+
+    def _read_meta(self) -> dict[str, Any]:
+        try:
+            with open(self._meta_filename, "rb") as f:
+                return json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        atomic_write(self._meta_filename, json.dumps(meta).encode(), self._fsync)
+
+    @contextmanager
+    def _write_lock(self):
+        """
+        Межпроцессная блокировка записи. При захвате кеш сверяется с версией хранилища
+        и перечитывается, если другой процесс успел записать изменения.
+        Пока есть отложенные изменения группового коммита, блокировка не освобождается.
+        """
+
+        with self._mutex:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            lock, self._held_lock = self._held_lock, None
+            acquired = lock is None
+            if acquired:
+                lock = ExitStack()
+                lock.enter_context(file_lock(f"{self._filename}.lock"))
+            self._lock_depth = 1
+            try:
+                if acquired:
+                    meta = self._read_meta()
+                    version = meta.get("version", 0)
+                    if hasattr(self, "_cache") and version != self._version:
+                        self.clean_cache()
+                    if not hasattr(self, "_cache"):
+                        self._version = version
+                    self._last_id = self._read_last_id(meta)
+                yield
+            finally:
+                self._lock_depth = 0
+                if self._deferred_changes:
+                    self._held_lock = lock
+                else:
+                    lock.close()
+
+    def _meta_value(self, key: str) -> Any:
+        """
+        Значение из метаданных, если они записаны для текущего состояния файлов хранилища
+        (после записи в обход TaskStorage или сбоя между записями - None).
+        """
+
+        meta = self._read_meta()
+        if meta.get("signature") != list(self._file_signature() or ()):
+            return None
+        return meta.get(key)
+
+    def _write_header(self, last_id: int, count: int, aggregates: Aggregates | None = None) -> None:
+        """
+        Метаданные хранилища: версия, последний id и количество задач, чтобы
+        не читать хранилище при старте, и сигнатура файлов, для которых они верны.
+        Сводные счетчики записываются, если они известны: загружено хранилище или
+        переданы aggregates.
+        """
+
+        signature = list(self._file_signature() or ())
+        self._write_meta(
+            {
+                "version": self._version,
+                "last_id": last_id,
+                "count": count,
+                "signature": signature,
+            }
+        )
+        if aggregates is None and hasattr(self, "_cache"):
+            aggregates = self._aggregates
+        if aggregates is not None:
+            data = {
+                "signature": signature,
+                "last_id": last_id,
+                "aggregates": aggregates.dump(dt.date.today().toordinal()),
+            }
+            atomic_write(self._stats_filename, json.dumps(data).encode(), self._fsync)
+
+    @property
+    def _stats_filename(self) -> str:
+        return f"{self._filename}.stats"
+
+    def _stored_aggregates(self) -> Aggregates | None:
+        """Сохраненные сводные счетчики, если они соответствуют текущему состоянию файлов."""
+
+        try:
+            with open(self._stats_filename, "rb") as f:
+                stats = json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        aggregates = Aggregates.from_dump(stats["aggregates"])
+        if stats["signature"] == list(self._file_signature() or ()):
+            return aggregates
+        return self._aggregates_after(stats, aggregates)
+
+    def _aggregates_after(self, stats: dict[str, Any], aggregates: Aggregates) -> Aggregates | None:
+        """
+        Досчитывает сохраненные счетчики по изменениям, записанным после них.
+        Базовое хранилище перезаписывает счетчики при каждом сохранении, поэтому None.
+        """
+
+        return None
+
+    def _save(
+        self,
+        storage_data: list[Task] | None,
+        changes: list[tuple[str, Any]],
+        count: int | None = None,
+    ) -> None:
+        """
+        Сохраняет изменения и увеличивает версию хранилища. storage_data может
+        отсутствовать, если хранилище не загружено, тогда передается количество задач.
+        Если сохранить не удалось, кеш с несохраненными изменениями сбрасывается
+        и при следующем обращении перечитывается с диска.
+        """
+
+        try:
+            self._persist(storage_data, changes)
+        except Exception:
+            if hasattr(self, "_cache"):
+                self.clean_cache()
+            raise
+        self._version += 1
+        # счетчик id не уменьшается при удалении, иначе id удаленных задач выдавались бы повторно.
+        self._write_header(self._last_id, len(storage_data) if count is None else count)
 
     def refresh(self, storage_data: list[dict[str]]) -> None:
         self._dump(storage_data)
 
-    def _load(self) -> list[dict[str]] | list:
-        with open(self._filename, "r") as f:
-            return json.load(f)
+    def _persist(self, storage_data: list[Task], changes: list[tuple[str, Any]]) -> None:
+        """
+        Сохраняет результат мутации. changes - список изменений в виде
+        ('put', задача) или ('delete', [id, ...]), используется журналируемыми хранилищами.
+        Базовое хранилище перезаписывает файл целиком и, вне режима сквозной записи,
+        сбрасывает кеш.
+        """
+
+        self.refresh(storage_data)
+        if self._write_through:
+            self._signature = self._file_signature()
+        else:
+            self.clean_cache()
+
+    def _commit(self, storage_data: list[Task], changes: list[tuple[str, Any]]) -> None:
+        """
+        Сохраняет изменения сразу или откладывает их до конца транзакции,
+        в режиме группового коммита - до ближайшего flush.
+        """
+
+        if self._pending_changes is not None:
+            self._pending_changes.extend(changes)
+        elif self._commit_delay:
+            self._defer(changes)
+        else:
+            self._save(storage_data, changes)
+
+    def _defer(self, changes: list[tuple[str, Any]]) -> None:
+        self._deferred_changes.extend(changes)
+        if len(self._deferred_changes) >= self._commit_batch_size:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self._commit_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
 
-    def _dump(self, data: dict[str]) -> None:
-        with open(self._filename, "w") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    @timed
+    def flush(self) -> None:
+        """Сохраняет отложенные изменения группового коммита и освобождает блокировку записи."""
 
-    def _get_last_id(self) -> int:
-        if cache := self.cache:
-            return max([task["id"] for task in cache])
-        return 0
+        with self._mutex:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._deferred_changes:
+                return
+            with self._write_lock():
+                changes, self._deferred_changes = self._deferred_changes, []
+                self._save(self.cache, changes)
+                self._save_text_index()
 
+    def close(self) -> None:
+        """
+        Сохраняет отложенные изменения и полнотекстовый индекс,
+        останавливает таймер группового коммита.
+        """
+
+        self.flush()
+        self._save_text_index()
+        _group_commit_storages.discard(self)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Группирует мутации: изменения сохраняются один раз при выходе из блока.
+        Вложенные транзакции присоединяются к внешней. При исключении ничего
+        не сохраняется: кеш и отложенные изменения группового коммита сбрасываются,
+        как при неудачном сохранении, и при следующем обращении хранилище перечитывается.
+        """
+
+        if self._pending_changes is not None:
+            yield self
+            return
+        with self._write_lock():
+            storage_data = self.cache
+            self._pending_changes = []
+            try:
+                yield self
+            except BaseException:
+                self._pending_changes = None
+                self._discard_unsaved()
+                raise
+            changes, self._pending_changes = self._pending_changes, None
+            if changes:
+                self._commit(storage_data, changes)
+
+    def _discard_unsaved(self) -> None:
+        """Сбрасывает кеш и отложенные изменения, которые не попали на диск."""
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._deferred_changes = []
+        if hasattr(self, "_cache"):
+            self.clean_cache()
+
+    def _load(self) -> list[Task] | list:
+        with open(self._filename, "rb") as f:
+            raw = f.read()
+        metrics.incr("storage.bytes_read", len(raw))
+        return serializers.load_tasks(raw)
+
+    def _dump(self, data: list[Task | dict[str]]) -> None:
+        with metrics.timer("storage.dump"):
+            raw = serializers.dumps(data, self._format)
+            atomic_write(self._filename, raw, self._fsync)
+        metrics.incr("storage.bytes_written", len(raw))
+
+    def _stream(self) -> Iterator[Task] | None:
+        """Задачи файла по одной, если хранилище не загружено, иначе None - данные берутся из кеша."""
+
+        if not self._streaming_reads or hasattr(self, "_cache"):
+            return None
+        return reader.iter_tasks(self._filename)
+
+    def _read_last_id(self, meta: dict[str, Any]) -> int:
+        """
+        Последний выданный id - счетчик в метаданных, который только растет, поэтому
+        id удаленных задач не выдаются повторно. Если метаданные записаны не для текущих
+        файлов хранилища (файл изменен в обход TaskStorage, метаданных еще нет), счетчик
+        поднимается до наибольшего id в хранилище.
+        """
+
+        last_id = meta.get("last_id", 0)
+        if meta.get("signature") == list(self._file_signature() or ()):
+            return last_id
+        self.cache
+        return max(last_id, max(self._id_index, default=0))
+
+    @timed
+    @mutation
     def add_task(self, new_data: dict[str]) -> None:
         """Добавляет задачу"""
 
-        storage_data = self.cache
         self._last_id += 1
         new_data["id"] = self._last_id
-        storage_data.append(new_data)
-        self.refresh(storage_data)
-        self.clean_cache()
+        task = Task(new_data)
+        if (
+            self._append_only
+            and not hasattr(self, "_cache")
+            and self._pending_changes is None
+            and not self._commit_delay
+            and (count := self._meta_value("count")) is not None
+        ):
+            # запись дописывается в журнал без загрузки хранилища.
+            self._save(None, [("put", task)], count + 1)
+            return
+        storage_data = self.cache
+        storage_data.append(task)
+        self._index_add(task)
+        self._commit(storage_data, [("put", task)])
+
+    @timed
+    def count_tasks(self) -> int:
+        """Количество задач, без загрузки хранилища, если метаданные актуальны."""
+
+        if not hasattr(self, "_cache") and (count := self._meta_value("count")) is not None:
+            return count
+        self._count_cache_access()
+        return len(self.cache)
+
+    @timed
+    def summary(self, today: str | None = None) -> dict[str, Any]:
+        """
+        Сводка по категориям и итог: количество задач, выполненных, невыполненных
+        по приоритетам, просроченных на дату today (по умолчанию - текущую) и доля выполненных.
+        Пока хранилище не загружено, используются сохраненные счетчики (если они сохранены
+        не позже today, см. Aggregates).
+        """
 
-    def show_tasks(self):
-        return self.cache
+        today = dt.date.fromisoformat(today).toordinal() if today else dt.date.today().toordinal()
+        aggregates = None
+        if not hasattr(self, "_cache"):
+            aggregates = self._stored_aggregates()
+        if aggregates is None or aggregates.as_of > today:
+            # обращение к кешу загружает хранилище и строит счетчики.
+            self._count_cache_access()
+            self.cache
+            aggregates = self._aggregates
+        return aggregates.summary(today)
+
+    @timed
+    def show_tasks(self) -> list[dict[str, Any]]:
+        self._count_cache_access()
+        return [task.to_dict() for task in self.cache]
+
+    @timed
+    def iter_tasks(
+        self, offset: int = 0, limit: int | None = None, sort_key: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Постраничный обход задач. Без sort_key задачи выдаются в порядке хранилища,
+        по индексируемым полям - через индекс, по остальным полям выбираются
+        только первые offset + limit задач. Без sort_key незагруженное хранилище читается потоком.
+        """
+
+        self._count_cache_access(streaming=sort_key is None)
+        stop = None if limit is None else offset + limit
+        if sort_key is None:
+            tasks = self._stream() or iter(self.cache)
+        else:
+            storage_data = self.cache
+            if sort_key in self._indexes:
+                tasks = self._indexes[sort_key].iter_sorted()
+            elif stop is None:
+                tasks = iter(sorted(storage_data, key=lambda task: task.get(sort_key)))
+            else:
+                tasks = iter(
+                    heapq.nsmallest(stop, storage_data, key=lambda task: task.get(sort_key))
+                )
+        for task in islice(tasks, offset, stop):
+            yield task.to_dict()
 
     def _keywords_search(
         self, storage_data: list[dict[str, Any]], keywords: list[str]
@@ -67,18 +624,39 @@ class TaskStorage:
         Метод использует search, когда требуется поиск по ключевым словам.
         Поиск ключевых слов определяется в значения ключей 'title' и 'description'.
         Результат отсортировывает в зависимости от количества совпадений.
+        Ключевые слова из символов слова ищутся по полнотекстовому индексу,
+        остальные (например, 'c++') и все слова без индекса - перебором хранилища.
+        Порядок результата перебора не зависит от того, параллельный ли он.
         """
-        pattern = rf"\b({'|'.join(keywords)})\b"
-        count_match_with_data_pos = []
-        for idx, task in enumerate(storage_data):
-            title_result, desc_result = re.findall(pattern, task["title"]), re.findall(
-                pattern, task["description"]
-            )
-            if title_result or desc_result:
-                count_match_with_data_pos.append((idx, max(len(title_result), len(desc_result))))
+        keywords = [keyword for keyword in keywords if keyword]
+        if self._full_text_index and all(TOKEN_PATTERN.fullmatch(keyword) for keyword in keywords):
+            # id задач возрастают в порядке хранилища, поэтому равные по совпадениям
+            # задачи упорядочиваются по id так же, как по позиции.
+            count_match_with_id = self._keyword_index().search(keywords)
+            count_match_with_id.sort(key=lambda match: (match[1], match[0]), reverse=True)
+            return [self._id_index[task_id] for task_id, _ in count_match_with_id]
+        pattern = rf"\b({'|'.join(map(re.escape, keywords))})\b"
+        metrics.incr("storage.tasks_scanned", len(storage_data))
+        if self._scan_workers > 1 and len(storage_data) >= self._parallel_scan_threshold:
+            from .scan import parallel_scan
+
+            texts = self._shared_texts(storage_data)
+            count_match_with_data_pos = parallel_scan(texts, pattern, self._scan_workers)
+        else:
+            regex = re.compile(pattern)
+            count_match_with_data_pos = []
+            for idx, task in enumerate(storage_data):
+                title_result, desc_result = regex.findall(task.title), regex.findall(
+                    task.description
+                )
+                if title_result or desc_result:
+                    count_match_with_data_pos.append(
+                        (idx, max(len(title_result), len(desc_result)))
+                    )
         count_match_with_data_pos.sort(key=lambda match: (match[1], match[0]), reverse=True)
         return [storage_data[idx] for idx, _ in count_match_with_data_pos]
 
+    @timed
     def search_task(self, search_data: tuple[str, str], max_return=None) -> list[dict[str, Any]]:
         """
         Поиск задач по ключам.
@@ -86,18 +664,161 @@ class TaskStorage:
         В рамках интерфейса, возможен поиск по любому ключу имеющихся в задаче.
         """
 
+        key = search_data[0]
+        self._count_cache_access(key != "keywords" and (key == "id" or max_return is not None))
+        return [task.to_dict() for task in self._search(search_data, max_return)]
+
+    def _search(self, search_data: tuple[str, Any], max_return=None) -> list[Task]:
         key, value = search_data
+        if key != "keywords" and (key == "id" or max_return is not None):
+            # поиск до первых совпадений не требует загрузки хранилища.
+            if (stream := self._stream()) is not None:
+                return self._scan(stream, key, value, 1 if key == "id" else max_return)
         storage_data = self.cache
         if key == "keywords":
             return self._keywords_search(storage_data, value)
+        if key == "id":
+            task = self._id_index.get(value)
+            return [task] if task is not None and max_return != 0 else []
+        if key in self._indexes:
+            return self._indexes[key].get(value, max_return)
+        return self._scan(storage_data, key, value, max_return)
+
+    @staticmethod
+    def _scan(tasks: Iterable[Task], key: str, value: Any, max_return=None) -> list[Task]:
         match = []
-        for task in storage_data:
+        scanned = 0
+        for scanned, task in enumerate(tasks, 1):
             if len(match) == max_return:
                 break
             if task.get(key) == value:
                 match.append(task)
+        metrics.incr("storage.tasks_scanned", scanned)
         return match
 
+    @timed
+    def due_tasks(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        max_return: int | None = None,
+        status: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Задачи со сроком выполнения от start до end включительно (даты 'YYYY-MM-DD',
+        открытая граница - None) в порядке срока, при равенстве - в порядке id.
+        Диапазон выбирается по индексу сроков, status дополнительно фильтрует задачи.
+        """
+
+        self._count_cache_access()
+        return self._due_tasks(start, end, max_return, status)
+
+    def _due_tasks(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        max_return: int | None = None,
+        status: str | None = None,
+    ) -> list[dict[str, Any]]:
+        # обращение к кешу загружает хранилище и строит индексы.
+        self.cache
+        open_only = status is not None and status != DueDateIndex.DONE
+        tasks = self._due_index.iter_range(*self._due_bounds(start, end), open_only)
+        if status is not None:
+            tasks = (task for task in tasks if task.status == status)
+        return [task.to_dict() for task in islice(tasks, max_return)]
+
+    @staticmethod
+    def _due_bounds(start: str | None, end: str | None) -> tuple[int | None, int | None]:
+        """Переводит диапазон дат [start, end] в полуинтервал порядковых номеров дней."""
+
+        try:
+            return (
+                None if start is None else dt.date.fromisoformat(start).toordinal(),
+                None if end is None else dt.date.fromisoformat(end).toordinal() + 1,
+            )
+        except (TypeError, ValueError):
+            raise InvalidInputData(f"Невалидный диапазон дат {start} - {end}")
+
+    @timed
+    def overdue_tasks(
+        self, today: str | None = None, max_return: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Невыполненные задачи со сроком раньше today (по умолчанию - текущей даты)."""
+
+        today = dt.date.fromisoformat(today) if today is not None else dt.date.today()
+        yesterday = (today - dt.timedelta(days=1)).isoformat()
+        self._count_cache_access()
+        return self._due_tasks(end=yesterday, max_return=max_return, status="Не выполнена")
+
+    @timed
+    def query(
+        self,
+        filters: dict[str, Any],
+        sort_key: str | list[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Составной запрос: условия на несколько полей, сортировка и постраничная выборка
+        (формат условий описан в manager_app.query). Кандидаты берутся из самого
+        селективного из применимых индексов, остальные условия проверяются за один
+        проход по кандидатам.
+        """
+
+        self._count_cache_access()
+        storage_data = self.cache
+        conditions = parse_filters(filters)
+        plans = [plan for condition in conditions if (plan := self._index_plan(condition))]
+        rank = None
+        for condition in conditions:
+            if condition.op == "keywords":
+                ranked = self._keywords_search(storage_data, condition.value)
+                rank = {task["id"]: position for position, task in enumerate(ranked)}
+                plans.append((len(ranked), lambda: sorted(ranked, key=lambda task: task["id"])))
+        candidates = min(plans, key=lambda plan: plan[0])[1]() if plans else storage_data
+        metrics.incr("storage.tasks_scanned", len(candidates))
+        checks = [condition.match for condition in conditions if condition.op != "keywords"]
+        tasks = [
+            task
+            for task in candidates
+            if (rank is None or task["id"] in rank) and all(check(task) for check in checks)
+        ]
+        if sort_key is None and rank is not None:
+            tasks.sort(key=lambda task: rank[task["id"]])
+        else:
+            sort_tasks(tasks, sort_key)
+        stop = None if limit is None else offset + limit
+        return [task.to_dict() for task in tasks[offset:stop]]
+
+    def _index_plan(self, condition: Condition) -> tuple[int, Callable[[], list[Task]]] | None:
+        """
+        Оценка числа кандидатов по индексу для условия и функция их выборки
+        в порядке хранилища. None, если индекс к условию неприменим.
+        """
+
+        key, op, value = condition.key, condition.op, condition.value
+        by_id = functools.partial(sorted, key=lambda task: task["id"])
+        if op in ("eq", "in"):
+            values = [value] if op == "eq" else list(value)
+            if key == "id":
+                return len(values), lambda: by_id(
+                    self._id_index[task_id] for task_id in values if task_id in self._id_index
+                )
+            if key in self._indexes:
+                index = self._indexes[key]
+                return sum(map(index.count, values)), lambda: by_id(
+                    task for value in values for task in index.get(value)
+                )
+        if op == "range" and key == "due_date":
+            start, stop = self._due_bounds(*value)
+            return self._due_index.count_range(start, stop), lambda: by_id(
+                self._due_index.iter_range(start, stop)
+            )
+        return None
+
+    @timed
+    @mutation
     def delete_task(self, delete_data: tuple[str, str]) -> None:
         """
         Удаление задачи по ключам. По id или по категории.
@@ -107,38 +828,118 @@ class TaskStorage:
         storage_data = self.cache
         if "id" in delete_data:
             # т.к. id уникален в дальнейшей проходке по листу нет смысла.
-            search_result = self.search_task(delete_data, max_return=1)
+            search_result = self._search(delete_data, max_return=1)
         else:
-            search_result = self.search_task(delete_data)
+            search_result = self._search(delete_data)
 
         if not search_result:
             raise DataDoesNotExists(f"Задачи с такими данными: {delete_data} не найдена")
         for task in search_result:
-            storage_data.remove(task)
-        self.refresh(storage_data)
-        self.clean_cache()
+            self._index_remove(task)
+        storage_data[:] = [task for task in storage_data if task.id in self._id_index]
+        self._commit(storage_data, [("delete", [task["id"] for task in search_result])])
 
+    @timed
+    @mutation
     def edit_task(self, new_data: tuple[int, str, Any]) -> None:
         """Редактирование задачи."""
 
         storage_data = self.cache
         task_id, change_key, new_value = new_data
-        search_result = self.search_task(("id", task_id), max_return=1)
-        if not search_result:
-            raise DataDoesNotExists(f"Задачи с id {task_id} не найдена")
-        task = search_result.pop()
+        task = self._get_by_id(task_id)
+        self._index_remove(task, (change_key,))
         task[change_key] = new_value
-        self.refresh(storage_data)
-        self.clean_cache()
+        self._index_add(task, (change_key,))
+        self._commit(storage_data, [("put", task)])
 
+    @timed
+    @mutation
     def done_task(self, task_id: int) -> None:
         """Завершение задачи (установка статуса 'выполнена')."""
 
         storage_data = self.cache
-        search_result = self.search_task(("id", task_id), max_return=1)
-        if not search_result:
-            raise DataDoesNotExists(f"Задачи с id {task_id} не найдена")
-        task = search_result.pop()
+        task = self._get_by_id(task_id)
+        self._index_remove(task, ("status",))
         task["status"] = "Выполнена"
-        self.refresh(storage_data)
-        self.clean_cache()
+        self._index_add(task, ("status",))
+        self._commit(storage_data, [("put", task)])
+
+    @timed
+    @mutation
+    def add_many(self, new_tasks: Iterable[dict[str]]) -> list[int]:
+        """Добавляет задачи одним проходом, id выделяются блоком, сохранение однократное."""
+
+        storage_data = self.cache
+        new_tasks = [Task(task) for task in new_tasks]
+        for task_id, task in enumerate(new_tasks, self._last_id + 1):
+            task["id"] = task_id
+            self._index_add(task)
+        self._last_id += len(new_tasks)
+        storage_data.extend(new_tasks)
+        if new_tasks:
+            self._commit(storage_data, [("put", task) for task in new_tasks])
+        return [task["id"] for task in new_tasks]
+
+    def _select(
+        self,
+        storage_data: list[Task],
+        predicate_or_ids: Callable[[dict[str]], bool] | Iterable[int],
+    ) -> list[Task]:
+        if callable(predicate_or_ids):
+            return [task for task in storage_data if predicate_or_ids(task)]
+        task_ids = dict.fromkeys(predicate_or_ids)
+        return [self._id_index[task_id] for task_id in task_ids if task_id in self._id_index]
+
+    @timed
+    @mutation
+    def update_many(
+        self,
+        predicate_or_ids: Callable[[dict[str]], bool] | Iterable[int],
+        changes: dict[str, Any],
+    ) -> int:
+        """
+        Изменяет поля changes у задач, выбранных предикатом или списком id.
+        Возвращает количество измененных задач.
+        """
+
+        storage_data = self.cache
+        tasks = self._select(storage_data, predicate_or_ids)
+        for task in tasks:
+            self._index_remove(task, changes)
+            task.update(changes)
+            self._index_add(task, changes)
+        if tasks:
+            self._commit(storage_data, [("put", task) for task in tasks])
+        return len(tasks)
+
+    @timed
+    @mutation
+    def delete_where(self, filters: dict[str, Any]) -> int:
+        """
+        Удаляет задачи, у которых все поля filters равны указанным значениям.
+        Кандидаты берутся из самого селективного индекса. Возвращает количество удаленных задач.
+        """
+
+        if not filters:
+            raise InvalidInputData("Не указаны условия удаления задач")
+        storage_data = self.cache
+        indexed = [(key, value) for key, value in filters.items() if key in self._indexes]
+        if "id" in filters:
+            candidates = self._search(("id", filters["id"]))
+        elif indexed:
+            key, value = min(indexed, key=lambda item: self._indexes[item[0]].count(item[1]))
+            candidates = self._indexes[key].get(value)
+        else:
+            candidates = storage_data
+        metrics.incr("storage.tasks_scanned", len(candidates))
+        tasks = [
+            task
+            for task in candidates
+            if all(task.get(key) == value for key, value in filters.items())
+        ]
+        for task in tasks:
+            self._index_remove(task)
+        if tasks:
+            storage_data[:] = [task for task in storage_data if task.id in self._id_index]
+            self._commit(storage_data, [("delete", [task["id"] for task in tasks])])
+        return len(tasks)
@@ -0,0 +1,138 @@
+import sys
+import datetime as dt
+from collections.abc import MutableMapping
+from typing import Any, Iterator
+
+
+class Task(MutableMapping):
+    """
+    Компактное представление задачи в памяти хранилища.
+    Поля хранятся в слотах вместо словаря, повторяющиеся значения category/priority/status
+    интернируются (все задачи ссылаются на один объект строки), due_date в формате
+    'YYYY-MM-DD' хранится порядковым номером дня в отдельном слоте due_ordinal,
+    прочие значения due_date хранятся как есть. Снаружи задача ведет себя как словарь с ключами FIELDS,
+    для выдачи за пределы хранилища используется to_dict. Внутри хранилища поля
+    читаются атрибутами (task.id, task.due_date), что быстрее обращения по ключу.
+    """
+
+    FIELDS = ("id", "title", "description", "category", "due_date", "priority", "status")
+    INTERNED_FIELDS = ("category", "priority", "status")
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "category",
+        "_due_date",
+        "due_ordinal",
+        "priority",
+        "status",
+        "_extra",
+    )
+    _FIELD_SET = frozenset(FIELDS)
+    # общие объекты порядковых номеров дат по строке даты, аналог интернирования строк,
+    # и обратное соответствие для декодирования.
+    _date_ordinals: dict[str, int] = {}
+    _date_strings: dict[int, str] = {}
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        # известные поля заполняются напрямую, без обращений через интерфейс словаря.
+        get = data.get
+        self.id = get("id")
+        self.title = get("title")
+        self.description = get("description")
+        self.category = self.intern(get("category"))
+        due_date = get("due_date")
+        self.due_ordinal = ordinal = self.encode_date(due_date)
+        self._due_date = None if ordinal is not None else due_date
+        self.priority = self.intern(get("priority"))
+        self.status = self.intern(get("status"))
+        self._extra = None
+        if not self._FIELD_SET.issuperset(data):
+            self._extra = {key: value for key, value in data.items() if key not in self._FIELD_SET}
+
+    @staticmethod
+    def intern(value: Any) -> Any:
+        return sys.intern(value) if isinstance(value, str) else value
+
+    @staticmethod
+    def encode_date(value: Any) -> int | None:
+        """Порядковый номер дня для даты 'YYYY-MM-DD', для иных значений None."""
+
+        if not isinstance(value, str):
+            return None
+        if (ordinal := Task._date_ordinals.get(value)) is not None:
+            return ordinal
+        try:
+            date = dt.date.fromisoformat(value)
+        except ValueError:
+            return None
+        if date.isoformat() != value:
+            return None
+        ordinal = Task._date_ordinals[value] = date.toordinal()
+        Task._date_strings[ordinal] = value
+        return ordinal
+
+    @staticmethod
+    def decode_date(ordinal: int) -> str:
+        if (date := Task._date_strings.get(ordinal)) is None:
+            date = Task._date_strings[ordinal] = dt.date.fromordinal(ordinal).isoformat()
+        return date
+
+    @property
+    def due_date(self) -> Any:
+        if self.due_ordinal is not None:
+            return self.decode_date(self.due_ordinal)
+        return self._due_date
+
+    @due_date.setter
+    def due_date(self, value: Any) -> None:
+        # дата хранится только порядковым номером, _due_date - для значений не в формате даты.
+        self.due_ordinal = self.encode_date(value)
+        self._due_date = None if self.due_ordinal is not None else value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.INTERNED_FIELDS:
+            setattr(self, key, self.intern(value))
+        elif key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (len(self._extra) if self._extra is not None else 0)
+
+    def __repr__(self) -> str:
+        return f"Task({self.to_dict()!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "category": self.category,
+            "due_date": self.due_date,
+            "priority": self.priority,
+            "status": self.status,
+        }
+        if self._extra is not None:
+            data.update(self._extra)
+        return data
@@ -1,8 +1,12 @@
 import os
+import glob
 
 import pytest
 
 from manager_app.storage import TaskStorage
+from manager_app.journal import JournaledTaskStorage
+from manager_app.sharded import ShardedTaskStorage
+from manager_app.sqlite_storage import SQLiteTaskStorage
 
 
 @pytest.fixture(scope="class")
@@ -12,9 +16,38 @@ def storage():
     storage.refresh([])
     yield storage
     os.remove(TaskStorage._filename)
+    # служебные файлы хранилища: блокировка, метаданные.
+    for filename in glob.glob(f"{TaskStorage._filename}.*"):
+        os.remove(filename)
 
 
 @pytest.fixture()
 def override_input():
     yield __builtins__
     __builtins__["input"] = input
+
+
+@pytest.fixture()
+def journal_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(JournaledTaskStorage, "_filename", str(tmp_path / "tasks.json"))
+    return JournaledTaskStorage()
+
+
+@pytest.fixture()
+def json_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(TaskStorage, "_filename", str(tmp_path / "tasks.json"))
+    return TaskStorage()
+
+
+@pytest.fixture()
+def sharded_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(ShardedTaskStorage, "_filename", str(tmp_path / "tasks.json"))
+    return ShardedTaskStorage()
+
+
+@pytest.fixture()
+def sqlite_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteTaskStorage, "_filename", str(tmp_path / "tasks.db"))
+    storage = SQLiteTaskStorage()
+    yield storage
+    storage.close()
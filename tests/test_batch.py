@@ -0,0 +1,37 @@
+import json
+
+from manager_app.manager import TaskManager
+from manager_app.batch import BatchExecutor
+
+
+class TestBatchExecutor:
+    def test_batch_applies_valid_lines(self, json_storage, monkeypatch):
+        commands = [
+            {"command": "add task", "title": "first", "description": "d", "category": "work",
+             "due_date": "2099-01-01", "priority": "высокий"},
+            {"command": "add task", "title": "second", "description": "d", "category": "home",
+             "due_date": "2099-01-01", "priority": "низкий"},
+            {"command": "add task", "title": "bad", "description": "d", "category": "work",
+             "due_date": "1995-01-01", "priority": "низкий"},
+            {"command": "edit task", "id": 2, "field": "priority", "value": "unknown"},
+            {"command": "done task", "id": 1},
+            {"command": "delete task", "by": "by category", "value": "Home"},
+            {"command": "done task", "id": 42},
+            {"command": "leave"},
+        ]
+        lines = [json.dumps(command, ensure_ascii=False) for command in commands] + ["{broken"]
+        persists = []
+        original_persist = json_storage._persist
+        monkeypatch.setattr(
+            json_storage, "_persist", lambda *args: persists.append(1) or original_persist(*args)
+        )
+        task_manager = TaskManager()
+        task_manager._storage = json_storage
+        report = BatchExecutor(task_manager).execute(lines)
+        assert report.applied == 4
+        assert [line for line, _ in report.errors] == [3, 4, 7, 8, 9], (
+            "Убедитесь, что ошибки сообщаются по номерам строк."
+        )
+        assert len(persists) == 1, "Убедитесь, что пакет сохраняется один раз."
+        assert [(task["id"], task["status"]) for task in json_storage.cache] == [(1, "Выполнена")]
+        assert json_storage.cache[0]["category"] == "Work"
@@ -0,0 +1,44 @@
+import multiprocessing
+
+import pytest
+
+from manager_app.storage import TaskStorage
+from manager_app.journal import JournaledTaskStorage
+from manager_app.sharded import ShardedTaskStorage
+from .utils import make_task
+
+WRITERS = 4
+TASKS_PER_WRITER = 25
+
+
+def write_tasks(storage_class: type, filename: str, writer: int) -> None:
+    storage_class._filename = filename
+    storage = storage_class()
+    for number in range(TASKS_PER_WRITER):
+        storage.add_task(make_task(f"writer{writer} task{number}"))
+    for task in storage.search_task(("keywords", [f"writer{writer}"]))[::2]:
+        storage.done_task(task["id"])
+
+
+class TestConcurrentWriters:
+    @pytest.mark.parametrize(
+        "storage_class", [TaskStorage, JournaledTaskStorage, ShardedTaskStorage]
+    )
+    def test_no_lost_writes(self, tmp_path, monkeypatch, storage_class):
+        filename = str(tmp_path / "tasks.json")
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=write_tasks, args=(storage_class, filename, writer))
+            for writer in range(WRITERS)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+        monkeypatch.setattr(storage_class, "_filename", filename)
+        tasks = storage_class().show_tasks()
+        assert len(tasks) == WRITERS * TASKS_PER_WRITER, "Убедитесь, что записи не теряются."
+        assert len({task["id"] for task in tasks}) == len(tasks), "Убедитесь, что id уникальны."
+        done = [task for task in tasks if task["status"] == "Выполнена"]
+        assert len(done) == WRITERS * ((TASKS_PER_WRITER + 1) // 2)
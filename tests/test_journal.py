@@ -0,0 +1,49 @@
+from manager_app.journal import JournaledTaskStorage
+from .utils import make_task
+
+
+class TestJournaledTaskStorage:
+    def test_replay_after_restart(self, journal_storage):
+        journal_storage.add_task(make_task("first"))
+        journal_storage.add_task(make_task("second"))
+        journal_storage.done_task(1)
+        journal_storage.delete_task(("id", 2))
+        restored = JournaledTaskStorage()
+        assert [task["id"] for task in restored.cache] == [1], (
+            "Убедитесь, что состояние восстанавливается из снимка и журнала."
+        )
+        assert restored.cache[0]["status"] == "Выполнена"
+        assert restored._last_id == 2
+
+    def test_torn_record_is_discarded(self, journal_storage):
+        journal_storage.add_task(make_task("first"))
+        with open(journal_storage._journal_filename, "a") as f:
+            f.write('["put",{"id":2,"tit')
+        restored = JournaledTaskStorage()
+        assert [task["id"] for task in restored.cache] == [1], (
+            "Убедитесь, что оборванная запись журнала не портит хранилище."
+        )
+        restored.add_task(make_task("second"))
+        assert [task["id"] for task in JournaledTaskStorage().cache] == [1, 2]
+
+    def test_compaction(self, journal_storage, monkeypatch):
+        monkeypatch.setattr(JournaledTaskStorage, "_compact_threshold", 1)
+        journal_storage.add_task(make_task("first"))
+        with open(journal_storage._journal_filename) as f:
+            assert not f.read(), "Убедитесь, что журнал сворачивается в снимок по порогу."
+        assert [task["id"] for task in JournaledTaskStorage().cache] == [1]
+
+    def test_add_without_loading(self, journal_storage):
+        journal_storage.add_task(make_task("first"))
+        journal_storage.add_task(make_task("second"))
+        journal_storage.delete_task(("id", 2))
+        restored = JournaledTaskStorage()
+        task = make_task("third")
+        restored.add_task(task)
+        assert restored.count_tasks() == 2
+        assert not hasattr(restored, "_cache"), "Убедитесь, что добавление не загружает хранилище."
+        assert task["id"] == 3, "Убедитесь, что id удаленной задачи не выдается повторно."
+        assert [task["title"] for task in JournaledTaskStorage().show_tasks()] == [
+            "first",
+            "third",
+        ]
@@ -5,7 +5,7 @@ import pytest
 
 from manager_app.manager import TaskManager
 from manager_app.exceptions import DataDoesNotExists, InvalidInputData
-from .utils import mock_input
+from .utils import make_task, mock_input
 
 
 class TestTaskManager:
@@ -167,3 +167,61 @@ class TestTaskManager:
             pass
         else:
             assert False, "Убедитесь, что при изменении несуществующей задачи возникает исключение."
+
+
+class TestTaskManagerPages:
+    def test_show_tasks_pages(self, json_storage, override_input, capsys, monkeypatch):
+        for title in ("first", "second", "third"):
+            json_storage.add_task(make_task(title))
+        monkeypatch.setattr(TaskManager, "PAGE_SIZE", 2)
+        task_manager = TaskManager()
+        task_manager._storage = json_storage
+        override_input["input"] = mock_input(["n", "p", ""])
+        task_manager.show_tasks()
+        pages = capsys.readouterr().out.split("| ID ")[1:]
+        assert len(pages) == 3, "Убедитесь, что задачи выводятся постранично."
+        assert "third" not in pages[0] and "third" in pages[1] and "first" in pages[2]
+
+
+class TestTaskManagerAgenda:
+    def test_agenda_and_overdue(self, json_storage, override_input, capsys):
+        today = dt.date.today()
+        for title, days in (("soon", 2), ("far", 30), ("late", -1)):
+            task = make_task(title)
+            task["due_date"] = (today + timedelta(days=days)).isoformat()
+            json_storage.add_task(task)
+        task_manager = TaskManager()
+        task_manager._storage = json_storage
+        override_input["input"] = mock_input([""])
+        task_manager.agenda()
+        output = capsys.readouterr().out
+        assert "soon" in output and "far" not in output and "late" not in output
+        task_manager.overdue()
+        output = capsys.readouterr().out
+        assert "late" in output and "soon" not in output, "Убедитесь, что выводятся просроченные задачи."
+        task_manager.summary()
+        output = capsys.readouterr().out
+        assert "ВСЕГО" in output and "Test" in output, "Убедитесь, что выводится сводка."
+
+
+class TestTaskManagerQuery:
+    def test_search_by_query(self, json_storage, override_input, capsys):
+        for title, priority in (("first", "Низкий"), ("second", "Средний"), ("third", "Высокий")):
+            task = make_task(title)
+            task["priority"] = priority
+            json_storage.add_task(task)
+        task_manager = TaskManager()
+        task_manager._storage = json_storage
+        task_manager._current_cmd = "search_tasks"
+        override_input["input"] = mock_input(
+            ["by query", "category=test; priority=низкий,средний; sort=-id; limit=1"]
+        )
+        task_manager.search_tasks()
+        output = capsys.readouterr().out
+        assert "second" in output and "first" not in output and "third" not in output
+
+    def test_invalid_query(self):
+        with pytest.raises(InvalidInputData):
+            TaskManager()._parse_query("category")
+        with pytest.raises(InvalidInputData):
+            TaskManager()._parse_query("owner=me")
@@ -0,0 +1,59 @@
+from manager_app.manager import TaskManager
+from manager_app.metrics import metrics
+from .utils import make_task, mock_input
+
+
+class TestMetrics:
+    def test_storage_operations_are_counted(self, json_storage):
+        metrics.reset()
+        json_storage.add_task(make_task("first"))
+        json_storage.search_task(("keywords", ["c++"]))
+        snapshot = metrics.snapshot()
+        assert snapshot["timers"]["storage.add_task"]["count"] == 1
+        assert snapshot["timers"]["storage.search_task"]["count"] == 1
+        assert snapshot["counters"]["storage.bytes_written"] > 0
+        assert snapshot["counters"]["storage.tasks_scanned"] == 1
+        assert (
+            snapshot["counters"]["storage.cache_hits"] == 1
+        ), "Убедитесь, что учитываются только обращения публичных операций чтения."
+        assert "storage.cache_misses" not in snapshot["counters"]
+
+    def test_streaming_and_nested_calls(self, json_storage, sqlite_storage):
+        json_storage.add_task(make_task("first"))
+        sqlite_storage.add_task(make_task("first"))
+        json_storage.clean_cache()
+        metrics.reset()
+        assert [task["id"] for task in json_storage.iter_tasks(0, 1)] == [1]
+        json_storage.search_task(("id", 1))
+        sqlite_storage.done_task(1)
+        snapshot = metrics.snapshot()
+        assert snapshot["timers"]["storage.iter_tasks"]["count"] == 1
+        assert (
+            snapshot["counters"]["storage.streamed_reads"] == 2
+        ), "Убедитесь, что чтение потоком не считается промахом кеша."
+        assert "storage.cache_misses" not in snapshot["counters"]
+        assert "storage.edit_task" not in snapshot["timers"], "Убедитесь, что вызов учтен один раз."
+
+    def test_prometheus_export(self, tmp_path):
+        metrics.reset()
+        metrics.record("command.show_tasks", 0.5)
+        metrics.incr("storage.bytes_read", 10)
+        filename = str(tmp_path / "metrics.prom")
+        metrics.export(filename)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        assert 'task_manager_calls_total{name="command.show_tasks"} 1' in lines
+        assert 'task_manager_seconds_total{name="command.show_tasks"} 0.5' in lines
+        assert 'task_manager_events_total{name="storage.bytes_read"} 10' in lines
+
+    def test_stats_command(self, json_storage, override_input, capsys):
+        metrics.reset()
+        task_manager = TaskManager()
+        task_manager._storage = json_storage
+        override_input["input"] = mock_input([""])
+        for command in ("show tasks", "stats"):
+            task_manager.check_command(command, task_manager.VALID_COMMANDS)
+            task_manager.command_execute()
+        output = capsys.readouterr().out
+        assert "command.show_tasks" in output and "render.table" in output
+        assert "storage.cache_hits" in output, "Убедитесь, что выводятся счетчики хранилища."
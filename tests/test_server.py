@@ -0,0 +1,100 @@
+import json
+import socket
+import asyncio
+import threading
+
+import pytest
+
+from manager_app.server import TaskClient, TaskServer
+from manager_app.exceptions import DataDoesNotExists
+from .utils import make_task
+
+
+@pytest.fixture()
+def server_address(json_storage, tmp_path):
+    address = f"unix:{tmp_path / 'tasks.sock'}"
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(TaskServer(json_storage).start(address))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield address
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.close()
+
+
+class TestTaskServer:
+    def test_client_roundtrip(self, server_address):
+        client = TaskClient(server_address)
+        task = make_task("remote")
+        client.add_task(task)
+        assert task["id"] == 1, "Убедитесь, что клиент получает id новой задачи."
+        client.done_task(1)
+        assert client.search_task(("status", "Выполнена"))[0]["title"] == "remote"
+        with pytest.raises(DataDoesNotExists):
+            client.delete_task(("id", 42))
+        assert [task["id"] for task in client.iter_tasks(0, 10)] == [1]
+        client.close()
+
+    def test_pipelined_writes_are_coalesced(self, server_address, json_storage, monkeypatch):
+        persists = []
+        original_persist = json_storage._persist
+        monkeypatch.setattr(
+            json_storage, "_persist", lambda *args: persists.append(1) or original_persist(*args)
+        )
+        requests = [
+            {"id": number, "method": "add_task", "params": [make_task(f"task{number}")]}
+            for number in range(50)
+        ]
+        sockets = [socket.socket(socket.AF_UNIX) for _ in requests]
+        streams = []
+        for sock, request in zip(sockets, requests):
+            sock.connect(server_address.removeprefix("unix:"))
+            streams.append(sock.makefile("rwb"))
+            streams[-1].write(json.dumps(request).encode() + b"\n")
+            streams[-1].flush()
+        responses = [json.loads(stream.readline()) for stream in streams]
+        for sock in sockets:
+            sock.close()
+        assert sorted(response["id"] for response in responses) == list(range(50))
+        assert sorted(response["result"] for response in responses) == list(range(1, 51))
+        assert len(persists) < len(requests), "Убедитесь, что изменения объединяются в пачки."
+
+    def test_pipelined_requests_keep_order(self, server_address):
+        requests = [
+            {"id": 1, "method": "add_task", "params": [make_task("first")]},
+            {"id": 2, "method": "search_task", "params": [["title", "first"]]},
+            {"id": 3, "method": "done_task", "params": [1]},
+            {"id": 4, "method": "search_task", "params": [["status", "Выполнена"]]},
+        ]
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(server_address.removeprefix("unix:"))
+            stream = sock.makefile("rwb")
+            stream.write(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+            stream.flush()
+            responses = [json.loads(stream.readline()) for _ in requests]
+        assert [response["id"] for response in responses] == [1, 2, 3, 4]
+        assert (
+            len(responses[1]["result"]) == len(responses[3]["result"]) == 1
+        ), "Убедитесь, что чтение видит предыдущие изменения того же соединения."
+
+    def test_failed_commit_is_not_visible(self, server_address, json_storage, monkeypatch):
+        client = TaskClient(server_address)
+        client.add_task(make_task("saved"))
+
+        def fail(*args):
+            raise OSError("диск заполнен")
+
+        monkeypatch.setattr(json_storage, "_persist", fail)
+        with pytest.raises(RuntimeError):
+            client.add_task(make_task("lost"))
+        monkeypatch.delattr(json_storage, "_persist")
+        assert [task["title"] for task in client.show_tasks()] == [
+            "saved"
+        ], "Убедитесь, что несохраненные изменения не остаются в кеше."
+        client.close()
@@ -0,0 +1,92 @@
+import os
+import json
+
+import pytest
+
+from manager_app import serializers
+from manager_app.sharded import ShardedTaskStorage
+from manager_app.exceptions import DataDoesNotExists
+from .utils import make_task
+
+
+def add_task(storage: ShardedTaskStorage, title: str, category: str) -> None:
+    task = make_task(title)
+    task["category"] = category
+    storage.add_task(task)
+
+
+def shard_files(storage: ShardedTaskStorage) -> dict[str, str]:
+    with open(storage._manifest_filename) as f:
+        return {key: shard["file"] for key, shard in json.load(f)["shards"].items()}
+
+
+class TestShardedTaskStorage:
+    def test_mutation_rewrites_affected_shard(self, sharded_storage):
+        add_task(sharded_storage, "first", "Работа")
+        add_task(sharded_storage, "second", "Дом")
+        before = shard_files(sharded_storage)
+        sharded_storage.done_task(2)
+        after = shard_files(sharded_storage)
+        assert (
+            after["Работа"] == before["Работа"]
+        ), "Убедитесь, что другие шарды не перезаписываются."
+        assert after["Дом"] != before["Дом"]
+        assert not os.path.exists(sharded_storage._shard_path(before["Дом"]))
+        sharded_storage.edit_task((1, "category", "Дом"))
+        assert list(shard_files(sharded_storage)) == ["Дом"], "Пустой шард удаляется."
+        restored = ShardedTaskStorage()
+        assert [(task["id"], task["category"]) for task in restored.show_tasks()] == [
+            (1, "Дом"),
+            (2, "Дом"),
+        ], "Убедитесь, что задачи восстанавливаются из шардов в порядке id."
+        assert restored.search_task(("status", "Выполнена"))[0]["id"] == 2
+
+    def test_category_operations_touch_single_shard(self, sharded_storage):
+        for number in range(3):
+            add_task(sharded_storage, f"work{number}", "Работа")
+            add_task(sharded_storage, f"home{number}", "Дом")
+        restored = ShardedTaskStorage()
+        found = restored.search_task(("category", "Дом"), max_return=2)
+        assert [task["title"] for task in found] == ["home0", "home1"]
+        restored.delete_task(("category", "Дом"))
+        assert list(restored.summary()["categories"]) == ["Работа"]
+        assert not hasattr(restored, "_cache"), "Убедитесь, что читается только шард категории."
+        assert restored.count_tasks() == 3
+        with pytest.raises(DataDoesNotExists):
+            restored.delete_task(("category", "Дом"))
+        assert list(restored.summary()["categories"]) == ["Работа"]
+        add_task(restored, "last", "Дом")
+        assert [task["id"] for task in ShardedTaskStorage().show_tasks()] == [1, 3, 5, 7]
+
+    def test_task_without_category(self, sharded_storage):
+        add_task(sharded_storage, "first", "Работа")
+        add_task(sharded_storage, "uncategorized", None)
+        restored = ShardedTaskStorage()
+        assert [task["title"] for task in restored.search_task(("category", None), 1)] == [
+            "uncategorized"
+        ], "Убедитесь, что задачи без категории хранятся в отдельном шарде."
+        restored.delete_task(("category", None))
+        assert [task["title"] for task in ShardedTaskStorage().show_tasks()] == ["first"]
+
+    def test_hash_partition(self, sharded_storage, monkeypatch):
+        monkeypatch.setattr(ShardedTaskStorage, "_partition", "hash")
+        monkeypatch.setattr(ShardedTaskStorage, "_shard_count", 3)
+        storage = ShardedTaskStorage()
+        storage.add_many(make_task(f"task{number}") for number in range(7))
+        assert sorted(shard_files(storage)) == ["0", "1", "2"]
+        storage.delete_task(("category", "Test"))
+        assert ShardedTaskStorage().show_tasks() == []
+
+    def test_split_existing_store(self, sharded_storage):
+        tasks = [{**make_task(f"task{number}"), "id": number} for number in range(1, 4)]
+        tasks[0]["category"] = "Дом"
+        with open(sharded_storage._filename, "wb") as f:
+            f.write(serializers.dumps(tasks))
+        storage = ShardedTaskStorage()
+        storage.done_task(3)
+        assert sorted(shard_files(storage)) == ["Test", "Дом"]
+        assert [task["status"] for task in ShardedTaskStorage().show_tasks()] == [
+            "Не выполнена",
+            "Не выполнена",
+            "Выполнена",
+        ], "Убедитесь, что существующее хранилище разбивается на шарды."
@@ -0,0 +1,49 @@
+import pytest
+
+from manager_app.migrate import migrate_json_to_sqlite
+from manager_app.exceptions import DataDoesNotExists
+from manager_app.sqlite_storage import SQLiteTaskStorage
+from .utils import make_task
+
+
+class TestSQLiteTaskStorage:
+    def test_crud(self, sqlite_storage):
+        for title in ("first", "second"):
+            sqlite_storage.add_task(make_task(title))
+        sqlite_storage.done_task(1)
+        sqlite_storage.edit_task((2, "category", "Other"))
+        assert [task["id"] for task in sqlite_storage.search_task(("status", "Выполнена"))] == [1]
+        assert sqlite_storage.search_task(("category", "Other"))[0]["title"] == "second"
+        sqlite_storage.delete_task(("category", "Other"))
+        assert [task["id"] for task in sqlite_storage.show_tasks()] == [1]
+        with pytest.raises(DataDoesNotExists):
+            sqlite_storage.delete_task(("id", 2))
+        with pytest.raises(DataDoesNotExists):
+            sqlite_storage.edit_task((2, "title", "missing"))
+
+    def test_keywords_ranking_matches_json_storage(self, sqlite_storage, json_storage):
+        for title in ["alpha beta", "beta beta", "gamma", "Alpha alpha alpha", "beta c++"]:
+            for storage in (sqlite_storage, json_storage):
+                task = make_task(title)
+                task["description"] = "alpha " + title
+                storage.add_task(task)
+        for keywords in (["alpha", "beta"], ["Alpha"], ["c++", "gamma"], ["missing"]):
+            assert sqlite_storage.search_task(("keywords", keywords)) == json_storage.search_task(
+                ("keywords", keywords)
+            ), f"Убедитесь, что ранжирование по {keywords} совпадает с TaskStorage."
+        sqlite_storage.edit_task((3, "title", "delta"))
+        assert [task["id"] for task in sqlite_storage.search_task(("keywords", ["delta"]))] == [3]
+
+    def test_migrate_from_json(self, json_storage, tmp_path):
+        for title in ("first", "second", "third"):
+            json_storage.add_task(make_task(title))
+        json_storage.delete_task(("id", 2))
+        target = str(tmp_path / "migrated.db")
+        assert migrate_json_to_sqlite(json_storage._filename, target) == 2
+        storage = SQLiteTaskStorage()
+        storage._filename = target
+        assert storage.show_tasks() == json_storage.show_tasks(), (
+            "Убедитесь, что задачи переносятся с сохранением id."
+        )
+        assert [task["id"] for task in storage.search_task(("keywords", ["third"]))] == [3]
+        storage.close()
@@ -0,0 +1,550 @@
+import gc
+import os
+import json
+import weakref
+import datetime as dt
+
+import pytest
+
+from manager_app import reader, serializers
+from manager_app.task import Task
+from manager_app.query import parse_filters
+from manager_app.indexes import DueDateIndex
+from manager_app.storage import TaskStorage
+from manager_app.journal import JournaledTaskStorage
+from manager_app.manager import TaskManager
+from manager_app.exceptions import InvalidInputData, DataDoesNotExists
+from .utils import make_task
+
+
+class TestTaskStorageCache:
+    def test_write_through_keeps_cache(self, json_storage):
+        cache = json_storage.cache
+        json_storage.add_task(make_task("first"))
+        json_storage.done_task(1)
+        assert json_storage.cache is cache, "Убедитесь, что мутации не сбрасывают кеш."
+        with open(json_storage._filename) as f:
+            assert json.load(f)[0]["status"] == "Выполнена", "Убедитесь, что кеш сохраняется."
+
+    def test_lazy_start_uses_meta(self, json_storage):
+        json_storage.add_many([make_task("first"), make_task("second")])
+        restored = TaskStorage()
+        assert restored._last_id == 2 and restored.count_tasks() == 2
+        assert not hasattr(restored, "_cache"), "Убедитесь, что хранилище не читается при старте."
+        # файл изменен в обход хранилища: метаданные не используются.
+        with open(json_storage._filename, "w") as f:
+            json.dump([{**make_task("external"), "id": 7}], f)
+        assert TaskStorage()._last_id == 7 and TaskStorage().count_tasks() == 1
+
+    def test_deleted_id_is_not_reused(self, json_storage):
+        json_storage.add_many([make_task("first"), make_task("second"), make_task("third")])
+        json_storage.delete_task(("id", 3))
+        task = make_task("fourth")
+        json_storage.add_task(task)
+        assert task["id"] == 4, "Убедитесь, что id удаленной задачи не выдается повторно."
+        assert TaskStorage()._last_id == 4
+
+    def test_restart_keeps_last_id_after_delete(self, json_storage):
+        json_storage.add_many([make_task("first"), make_task("second")])
+        json_storage.delete_task(("id", 2))
+        restored = TaskStorage()
+        task = make_task("third")
+        restored.add_task(task)
+        assert task["id"] == 3, "Убедитесь, что id удаленной задачи не выдается после перезапуска."
+
+    def test_reload_on_external_change(self, json_storage):
+        json_storage.add_task(make_task("first"))
+        other = TaskStorage()
+        other.add_task(make_task("second"))
+        assert [task["id"] for task in json_storage.cache] == [1, 2], (
+            "Убедитесь, что кеш перечитывается, если файл изменил другой процесс."
+        )
+
+
+class TestTaskStorageIndexes:
+    def test_secondary_index_follows_edit(self, json_storage):
+        for title in ("first", "second", "third"):
+            json_storage.add_task(make_task(title))
+        json_storage.edit_task((1, "category", "Other"))
+        json_storage.edit_task((1, "category", "Test"))
+        assert [task["id"] for task in json_storage.search_task(("category", "Test"))] == [
+            1,
+            2,
+            3,
+        ], "Убедитесь, что индекс возвращает задачи в порядке хранилища."
+        json_storage.done_task(2)
+        assert [task["id"] for task in json_storage.search_task(("status", "Выполнена"))] == [2]
+        assert json_storage.search_task(("status", "Не выполнена"), max_return=1)[0]["id"] == 1
+
+    def test_delete_by_category(self, json_storage):
+        for title in ("first", "second", "third"):
+            json_storage.add_task(make_task(title))
+        json_storage.edit_task((2, "category", "Other"))
+        json_storage.delete_task(("category", "Test"))
+        assert [task["id"] for task in json_storage.cache] == [2]
+        assert json_storage.search_task(("id", 1)) == [], "Убедитесь, что индексы согласованы."
+        assert [task["id"] for task in TaskStorage().cache] == [2]
+
+
+class TestKeywordsSearch:
+    def test_ranking_matches_regex_scan(self, json_storage):
+        titles = ["alpha beta", "beta beta", "gamma", "alpha alpha alpha", "beta"]
+        for title in titles:
+            task = make_task(title)
+            task["description"] = "alpha " + title
+            json_storage.add_task(task)
+        result = json_storage.search_task(("keywords", ["alpha", "beta", "alpha"]))
+        assert [task["id"] for task in result] == [4, 2, 1, 5, 3], (
+            "Убедитесь, что ранжирование совпадает с поиском по регулярному выражению."
+        )
+        storage_data = json_storage.cache
+        assert json_storage._keywords_search(storage_data, ["alpha", "beta", "c++"]) == result
+
+    def test_keywords_are_escaped(self, json_storage):
+        task = make_task("learn c++")
+        json_storage.add_task(task)
+        json_storage.add_task(make_task("learn python"))
+        assert [task["id"] for task in json_storage.search_task(("keywords", ["c++"]))] == []
+        assert json_storage.search_task(("keywords", ["(learn"])) == []
+        json_storage.edit_task((2, "title", "unlearn"))
+        assert [task["id"] for task in json_storage.search_task(("keywords", ["unlearn"]))] == [2]
+
+    def test_text_index_is_built_on_first_search(self, json_storage):
+        json_storage.add_task(make_task("first"))
+        json_storage.add_task(make_task("second"))
+        json_storage.done_task(1)
+        assert json_storage._text_index is None, "Убедитесь, что индекс не строится при загрузке."
+        assert [task["id"] for task in json_storage.search_task(("keywords", ["second"]))] == [2]
+        json_storage.edit_task((1, "title", "second"))
+        assert [task["id"] for task in json_storage.search_task(("keywords", ["second"]))] == [
+            2,
+            1,
+        ], "Убедитесь, что построенный индекс обновляется при изменениях."
+
+    def test_persisted_text_index(self, json_storage, monkeypatch):
+        monkeypatch.setattr(TaskStorage, "_persist_text_index", True)
+        json_storage.add_task(make_task("persisted"))
+        assert not os.path.exists(json_storage._text_index_filename), (
+            "Убедитесь, что индекс не перезаписывается при каждом изменении."
+        )
+        json_storage.close()
+        restored = TaskStorage()
+        # хранилище загружается при первом обращении к кешу.
+        restored.cache
+        assert restored._load_text_index() is not None, (
+            "Убедитесь, что сохраненный индекс используется при старте."
+        )
+        assert [task["id"] for task in restored.search_task(("keywords", ["persisted"]))] == [1]
+
+    def test_parallel_scan_matches_sequential(self, json_storage, monkeypatch):
+        words = ["alpha", "beta", "гамма", "c++", "delta"]
+        json_storage.add_many(
+            {
+                **make_task(" ".join(words[(number + shift) % 5] for shift in range(number % 4))),
+                "description": " ".join(words[: number % 6]),
+            }
+            for number in range(60)
+        )
+        monkeypatch.setattr(TaskStorage, "_full_text_index", False)
+        storage = TaskStorage()
+        storage_data = storage.cache
+        assert storage._text_index is None
+        for keywords in (["alpha", "гамма"], ["c++", "beta"], ["missing"]):
+            sequential = storage._keywords_search(storage_data, keywords)
+            monkeypatch.setattr(TaskStorage, "_parallel_scan_threshold", 1)
+            monkeypatch.setattr(TaskStorage, "_scan_workers", 2)
+            parallel = storage._keywords_search(storage_data, keywords)
+            monkeypatch.setattr(TaskStorage, "_scan_workers", 1)
+            assert [task["id"] for task in parallel] == [
+                task["id"] for task in sequential
+            ], "Убедитесь, что параллельный поиск ранжирует задачи как последовательный."
+            assert sequential == json_storage._keywords_search(json_storage.cache, keywords)
+        texts = storage._scan_texts
+        monkeypatch.setattr(TaskStorage, "_scan_workers", 2)
+        storage._keywords_search(storage_data, ["alpha"])
+        assert storage._scan_texts is texts, "Убедитесь, что блок текстов переиспользуется."
+        storage.edit_task((1, "title", "omega"))
+        assert storage._scan_texts is None, "Убедитесь, что блок сбрасывается при изменении."
+        assert [task["id"] for task in storage._keywords_search(storage.cache, ["omega"])] == [1]
+
+
+class TestIterTasks:
+    def test_pages_and_sort(self, json_storage, sqlite_storage):
+        for storage in (json_storage, sqlite_storage):
+            for title, category in (("a", "Work"), ("b", "Home"), ("c", "Work"), ("d", "Home")):
+                task = make_task(title)
+                task["category"] = category
+                storage.add_task(task)
+            assert [task["id"] for task in storage.iter_tasks(1, 2)] == [2, 3], (
+                "Убедитесь, что страница учитывает смещение и размер."
+            )
+            assert [task["id"] for task in storage.iter_tasks(0, 3, "category")] == [2, 4, 1]
+            assert [task["id"] for task in storage.iter_tasks(3, sort_key="title")] == [4]
+
+
+class TestBulkOperations:
+    def test_bulk_operations(self, json_storage, sqlite_storage, monkeypatch):
+        persists = []
+        original_persist = json_storage._persist
+        monkeypatch.setattr(
+            json_storage, "_persist", lambda *args: persists.append(1) or original_persist(*args)
+        )
+        for storage in (json_storage, sqlite_storage):
+            tasks = [make_task(title) for title in ("first", "second", "third", "fourth")]
+            tasks[3]["category"] = "Other"
+            assert storage.add_many(tasks) == [1, 2, 3, 4], "Убедитесь, что id выделяются блоком."
+            assert storage.update_many([1, 3, 42], {"status": "Выполнена"}) == 2
+            assert (
+                storage.update_many(lambda task: task["title"] == "second", {"priority": "Низкий"})
+                == 1
+            )
+            assert storage.delete_where({"category": "Test", "status": "Выполнена"}) == 2
+            assert [(task["id"], task["priority"]) for task in storage.show_tasks()] == [
+                (2, "Низкий"),
+                (4, "Высокий"),
+            ]
+            assert [task["id"] for task in storage.search_task(("status", "Не выполнена"))] == [
+                2,
+                4,
+            ]
+        assert (
+            len(persists) == 4
+        ), "Убедитесь, что каждая пакетная операция сохраняет данные один раз."
+        assert [task["id"] for task in TaskStorage().cache] == [2, 4]
+
+
+    def test_failed_transaction_is_not_saved(self, json_storage):
+        json_storage.add_task(make_task("saved"))
+        with pytest.raises(DataDoesNotExists):
+            with json_storage.transaction():
+                json_storage.add_task(make_task("lost"))
+                json_storage.done_task(1)
+                json_storage.done_task(42)
+        assert [
+            (task["title"], task["status"]) for task in json_storage.show_tasks()
+        ] == [("saved", "Не выполнена")], "Убедитесь, что прерванная транзакция не сохраняется."
+        json_storage.add_task(make_task("next"))
+        assert [task["id"] for task in TaskStorage().show_tasks()] == [1, 2]
+
+
+class TestDueDates:
+    def test_due_queries(self, json_storage, sqlite_storage):
+        for storage in (json_storage, sqlite_storage):
+            for title, due_date in (
+                ("late", "2024-01-10"),
+                ("today", "2024-02-01"),
+                ("week", "2024-02-05"),
+                ("later", "2024-03-01"),
+                ("done", "2024-01-05"),
+                ("also today", "2024-02-01"),
+            ):
+                task = make_task(title)
+                task["due_date"] = due_date
+                storage.add_task(task)
+            storage.done_task(5)
+            assert [task["id"] for task in storage.due_tasks("2024-02-01", "2024-02-07")] == [
+                2,
+                6,
+                3,
+            ], "Убедитесь, что диапазон включает границы и упорядочен по сроку."
+            assert [task["id"] for task in storage.due_tasks("2024-01-01", max_return=2)] == [5, 1]
+            assert [task["id"] for task in storage.overdue_tasks("2024-02-01")] == [
+                1
+            ], "Убедитесь, что выполненные задачи не считаются просроченными."
+            storage.edit_task((4, "due_date", "2024-01-20"))
+            storage.delete_task(("id", 1))
+            assert [task["id"] for task in storage.overdue_tasks("2024-02-01")] == [4]
+
+    def test_due_index_bulk_removal(self):
+        index = DueDateIndex()
+        tasks = [
+            Task({**make_task(f"task{number}"), "id": number, "due_date": f"2024-01-{number:02}"})
+            for number in range(1, 21)
+        ]
+        index.add_many(tasks)
+        for task in tasks[::2]:
+            index.remove(task)
+        index.remove(tasks[1])
+        tasks[1]["status"] = "Выполнена"
+        index.add(tasks[1])
+        stop = dt.date(2024, 1, 10).toordinal()
+        assert [task["id"] for task in index.iter_range(stop=stop)] == [2, 4, 6, 8]
+        assert [task["id"] for task in index.iter_range(stop=stop, open_only=True)] == [
+            4,
+            6,
+            8,
+        ], "Убедитесь, что выборка невыполненных не включает выполненные задачи."
+        for task in tasks[1::2]:
+            index.remove(task)
+        assert list(index.iter_range()) == [] and index.count_range() == 0
+
+
+class TestSummary:
+    @staticmethod
+    def fill(storage) -> None:
+        for title, category, priority, due_date in (
+            ("a", "Work", "Высокий", "2024-01-10"),
+            ("b", "Work", "Высокий", "2099-01-01"),
+            ("c", "Work", "Низкий", "2024-01-20"),
+            ("d", "Home", "Средний", "2024-01-05"),
+            ("e", "Home", "Высокий", "2099-01-01"),
+        ):
+            task = {**make_task(title), "category": category, "priority": priority}
+            storage.add_task({**task, "due_date": due_date})
+        storage.edit_task((2, "due_date", "2024-03-01"))
+        storage.done_task(3)
+        storage.edit_task((1, "priority", "Средний"))
+        storage.edit_task((5, "category", "Work"))
+        storage.delete_task(("id", 4))
+
+    def test_summary_follows_mutations(self, json_storage, sqlite_storage):
+        for storage in (json_storage, sqlite_storage):
+            self.fill(storage)
+            summary = storage.summary("2024-02-01")
+            assert summary["categories"] == {
+                "Work": {
+                    "total": 4,
+                    "done": 1,
+                    "overdue": 1,
+                    "open_by_priority": {"Высокий": 2, "Средний": 1},
+                    "completion_rate": 0.25,
+                }
+            }, "Убедитесь, что счетчики обновляются при изменении задач."
+            assert (
+                summary["total"]["total"] == 4
+                and storage.summary("2024-04-01")["total"]["overdue"] == 2
+            )
+        rebuilt = TaskStorage()
+        rebuilt.cache
+        assert rebuilt.summary("2024-02-01") == json_storage.summary("2024-02-01")
+
+    def test_summary_without_loading(self, journal_storage):
+        self.fill(journal_storage)
+        expected = journal_storage.summary("2024-02-01")
+        restored = JournaledTaskStorage()
+        restored.add_task(make_task("f"))
+        assert not hasattr(restored, "_cache")
+        summary = JournaledTaskStorage().summary("2024-02-01")
+        assert summary["categories"]["Test"]["total"] == 1
+        assert summary["categories"]["Work"] == expected["categories"]["Work"]
+        restored = JournaledTaskStorage()
+        restored.summary()
+        assert not hasattr(
+            restored, "_cache"
+        ), "Убедитесь, что сводка читается из сохраненных счетчиков."
+
+
+class TestQuery:
+    QUERIES = (
+        ({"category": "Test", "status": "Не выполнена"}, None, 0, None),
+        ({"priority": ["Низкий", "Средний"]}, "-due_date", 0, None),
+        ({"due_date": {"from": "2024-02-01", "to": "2024-03-01"}}, ["priority", "-id"], 0, 2),
+        ({"keywords": ["report"], "category": "Test"}, None, 0, None),
+        ({"keywords": ["report", "plan"]}, "title", 1, 2),
+        ({"id": [1, 3, 42], "status": "Не выполнена"}, None, 0, None),
+        ({}, "-title", 2, 3),
+    )
+
+    def test_query_matches_between_engines(self, json_storage, sqlite_storage):
+        rows = (
+            ("report", "Work", "2024-01-10", "Высокий"),
+            ("plan report", "Test", "2024-02-01", "Низкий"),
+            ("report report", "Test", "2024-02-15", "Средний"),
+            ("plan", "Test", "2024-03-01", "Средний"),
+            ("other", "Work", "2024-04-01", "Низкий"),
+        )
+        results = []
+        for storage in (json_storage, sqlite_storage):
+            for title, category, due_date, priority in rows:
+                task = make_task(title)
+                task.update(category=category, due_date=due_date, priority=priority)
+                storage.add_task(task)
+            storage.done_task(4)
+            results.append(
+                [[task["id"] for task in storage.query(*query)] for query in self.QUERIES]
+            )
+        assert results[0] == results[1], "Убедитесь, что движки выполняют запросы одинаково."
+        assert results[0] == [
+            [2, 3],
+            [5, 4, 3, 2],
+            [2, 4],
+            [3, 2],
+            [2, 1],
+            [1, 3],
+            [2, 4, 5],
+        ], "Убедитесь, что запрос учитывает все условия, сортировку и смещение."
+
+    def test_invalid_range(self, json_storage):
+        with pytest.raises(InvalidInputData):
+            json_storage.query({"due_date": {"after": "2024-01-01"}})
+        with pytest.raises(InvalidInputData):
+            json_storage.query({"due_date": {"from": "завтра"}})
+
+    def test_range_compares_dates(self, json_storage):
+        for title, due_date in (("date", "2024-02-01"), ("text", "2024-02-01 утром")):
+            task = make_task(title)
+            task.update(due_date=due_date, category="Test")
+            json_storage.add_task(task)
+        condition = parse_filters({"due_date": {"from": "2024-01-01", "to": "2024-12-31"}})[0]
+        assert [condition.match(task) for task in json_storage.cache] == [True, False], (
+            "Убедитесь, что диапазон сравнивает даты так же, как индекс сроков."
+        )
+        filters = {"category": "Test", "due_date": {"from": "2024-01-01"}}
+        assert [task["title"] for task in json_storage.query(filters)] == ["date"]
+
+
+class TestGroupCommit:
+    def test_burst_is_saved_once(self, json_storage, monkeypatch):
+        monkeypatch.setattr(TaskStorage, "_durability", "60000ms")
+        storage = TaskStorage()
+        persists = []
+        original_persist = storage._persist
+        monkeypatch.setattr(
+            storage, "_persist", lambda *args: persists.append(args[1]) or original_persist(*args)
+        )
+        for title in ("first", "second", "third"):
+            storage.add_task(make_task(title))
+        storage.done_task(2)
+        assert not persists, "Убедитесь, что изменения откладываются до сброса."
+        storage.flush()
+        assert len(persists) == 1 and len(persists[0]) == 4
+        assert storage._held_lock is None, "Убедитесь, что flush освобождает блокировку."
+        assert [task["status"] for task in TaskStorage().show_tasks()] == [
+            "Не выполнена",
+            "Выполнена",
+            "Не выполнена",
+        ]
+
+    def test_flush_by_batch_size_and_delay(self, json_storage, monkeypatch):
+        monkeypatch.setattr(TaskStorage, "_durability", "20ms")
+        monkeypatch.setattr(TaskStorage, "_commit_batch_size", 2)
+        storage = TaskStorage()
+        storage.add_task(make_task("first"))
+        storage.add_task(make_task("second"))
+        assert len(TaskStorage._load(storage)) == 2, "Убедитесь, что пачка сохраняется сразу."
+        storage.add_task(make_task("third"))
+        storage._flush_timer.join()
+        other = TaskStorage()
+        other.add_task(make_task("fourth"))
+        assert [task["id"] for task in other.cache] == [1, 2, 3, 4]
+        # таймер не должен сработать после смены _filename следующим тестом.
+        other.flush()
+
+    def test_durability_levels(self, json_storage, monkeypatch):
+        monkeypatch.setattr(TaskStorage, "_durability", "fsync")
+        assert TaskStorage()._fsync, "Убедитесь, что уровень fsync включает сброс на диск."
+        monkeypatch.setattr(TaskStorage, "_durability", "never")
+        with pytest.raises(ValueError):
+            TaskStorage()
+
+    def test_leave_flushes(self, json_storage, monkeypatch):
+        monkeypatch.setattr(TaskStorage, "_durability", "60000ms")
+        manager = TaskManager()
+        manager._storage = TaskStorage()
+        manager._storage.add_task(make_task("first"))
+        with pytest.raises(SystemExit):
+            manager.leave()
+        assert [task["title"] for task in TaskStorage().show_tasks()] == ["first"]
+
+    def test_close_releases_storage(self, json_storage, monkeypatch):
+        monkeypatch.setattr(TaskStorage, "_durability", "60000ms")
+        storage = TaskStorage()
+        storage.add_task(make_task("first"))
+        timer = storage._flush_timer
+        storage.close()
+        timer.join()
+        assert [task["title"] for task in TaskStorage().show_tasks()] == ["first"]
+        reference = weakref.ref(storage)
+        del storage, timer
+        gc.collect()
+        assert reference() is None, "Убедитесь, что хранилище не удерживается до выхода."
+
+
+class TestTask:
+    def test_compact_task_behaves_like_dict(self, json_storage):
+        data = make_task("first")
+        data["id"] = 1
+        task = Task(data)
+        assert task == data and task.to_dict() == data, "Убедитесь, что Task равен словарю."
+        assert tuple(task.values()) == tuple(data.values())
+        assert task.due_ordinal == dt.date(2099, 1, 1).toordinal()
+        task["due_date"] = "someday"
+        assert task["due_date"] == "someday" and task.due_ordinal is None
+        for value in (0, False, 738000):
+            task["due_date"] = value
+            assert task.to_dict()["due_date"] is value, "Убедитесь, что числа не читаются датой."
+            assert task.due_ordinal is None
+        other = Task(make_task("second"))
+        assert other.category is task.category, "Убедитесь, что повторяющиеся значения общие."
+        extended = Task({**data, "tags": ["x"]})
+        assert extended.due_date == "2099-01-01" and extended["tags"] == ["x"]
+        assert Task(extended) == extended, "Убедитесь, что дополнительные поля сохраняются."
+
+    def test_api_returns_dicts(self, json_storage):
+        json_storage.add_task(make_task("first"))
+        for result in (
+            json_storage.show_tasks(),
+            json_storage.search_task(("category", "Test")),
+            list(json_storage.iter_tasks()),
+        ):
+            assert type(result[0]) is dict, "Убедитесь, что хранилище выдает словари."
+        assert isinstance(json_storage.cache[0], Task)
+
+
+class TestSerializers:
+    @pytest.mark.parametrize("fmt", serializers.FORMATS)
+    def test_formats_roundtrip(self, json_storage, monkeypatch, fmt):
+        if fmt == "msgpack" and serializers.msgspec is None and serializers.msgpack is None:
+            pytest.skip("msgspec или msgpack не установлены")
+        json_storage.add_task(make_task("pretty"))
+        monkeypatch.setattr(TaskStorage, "_format", fmt)
+        json_storage.add_task(make_task("converted"))
+        assert [task["title"] for task in TaskStorage().show_tasks()] == [
+            "pretty",
+            "converted",
+        ], f"Убедитесь, что хранилище читается после записи в формате {fmt}."
+
+    def test_reads_legacy_file(self, json_storage):
+        data = make_task("legacy")
+        data["id"] = 7
+        with open(json_storage._filename, "w") as f:
+            json.dump([data], f, ensure_ascii=False, indent=2)
+        assert TaskStorage().show_tasks() == [data]
+
+    def test_nested_objects_stay_dicts(self):
+        data = {**make_task("nested"), "id": 1, "meta": {"tags": ["x"]}}
+        (task,) = serializers.load_tasks(serializers.dumps([data]))
+        assert (
+            isinstance(task, Task) and type(task["meta"]) is dict
+        ), "Убедитесь, что в Task превращаются только задачи списка."
+
+    @pytest.mark.parametrize("raw", [b"", b"  \n"])
+    def test_empty_input_is_json_error(self, raw):
+        with pytest.raises(serializers.DECODE_ERRORS):
+            serializers.loads(raw)
+
+
+class TestStreamingReads:
+    @pytest.mark.parametrize("fmt", ["pretty", "compact"])
+    def test_parser_matches_json(self, fmt):
+        tasks = [
+            {**make_task(f"задача {number} ]," + "ё" * number), "id": number}
+            for number in range(50)
+        ]
+        raw = serializers.dumps(tasks, fmt)
+        for chunk_size in (1, 7, 4096):
+            assert list(reader.iter_json_array(raw, chunk_size)) == tasks
+        with pytest.raises(ValueError):
+            list(reader.iter_json_array(raw[:-3], 7))
+
+    def test_reads_without_loading(self, json_storage):
+        json_storage.add_many(make_task(f"task{number}") for number in range(30))
+        json_storage.edit_task((25, "category", "Other"))
+        restored = TaskStorage()
+        assert [task["id"] for task in restored.iter_tasks(20, 3)] == [21, 22, 23]
+        assert restored.search_task(("id", 7))[0]["title"] == "task6"
+        assert restored.search_task(("id", 100)) == []
+        assert [task["id"] for task in restored.search_task(("category", "Other"), 1)] == [25]
+        assert not hasattr(restored, "_cache"), "Убедитесь, что чтение выполняется потоком."
+        assert len(restored.search_task(("category", "Test"))) == 29
+        assert hasattr(restored, "_cache")
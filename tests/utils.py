@@ -10,3 +10,15 @@ class mock_input:
         self.outputs.append(string)
         value = next(self.return_value)
         return value
+
+
+def make_task(title: str) -> dict[str]:
+    return {
+        "id": None,
+        "title": title,
+        "description": f"{title} description",
+        "category": "Test",
+        "due_date": "2099-01-01",
+        "priority": "Высокий",
+        "status": "Не выполнена",
+    }